@@ -1,81 +1,139 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, Callable, Optional, Tuple
 from fastapi import UploadFile
-import aiofiles
+import asyncio
+import json
+import logging
 import os
+import shutil
 import tempfile
 import pandas as pd
+from app.core.config import settings
+from app.core.metrics import RunTimer, run_timer
+from app.core.serialization import STREAM_MEDIA_TYPES, stream_records
 from app.services import transcript_client
-from app.services.evals_service import EvalsService
-from app.services.data_store import universal_data_store
+from app.services.evals_service import EvalsService, dataframe_to_records
+from app.services.ingest_service import BulkIngestParser
+from app.services.output_writers import CsvWriter, get_writer
+from app.services.upload_service import save_upload
+from app.services.async_data_store import async_data_store
 from app.models.schema import (
+    BulkIngestResponse,
     TextFieldsResponse, 
     ExcelDataResponse, 
     DocumentListResponse,
     DocumentDetailResponse,
     DocumentSummary,
     OutputDetailResponse,
-    OutputListResponse
+    OutputListResponse,
+    RecordListResponse,
+    UniversalDataRecord
 )
 
+logger = logging.getLogger(__name__)
+
+
+async def _as_batches(records: List[Dict[str, Any]]) -> AsyncIterator[List[Dict[str, Any]]]:
+    yield records
+
+
+def _document_source(doc: Dict[str, Any]) -> Tuple[str, int, AsyncIterator[List[Dict[str, Any]]]]:
+    """(created_updated_at, record_count, record batches) for any input document type."""
+    document_type = doc.get("document_type")
+    if document_type == "universal_dataset":
+        return doc.get("updated_at", ""), doc.get("record_count", 0), async_data_store.iter_universal_records()
+    if document_type == "excel_upload":
+        records, created_updated_at = doc.get("records", []), doc.get("uploaded_at", "")
+    elif document_type == "text_field_entry":
+        records, created_updated_at = [doc.get("entry", {})], doc.get("created_at", "")
+    else:
+        records, created_updated_at = [], ""
+    return created_updated_at, len(records), _as_batches(records)
+
 
 class EvalsController:
     def __init__(self, service: EvalsService):
         self.service = service
         self.transcript_analyzer = service.transcript_client
 
-    async def handle_upload_and_process(self, upload_file: UploadFile) -> List[Dict[str, Any]]:
-        suffix = os.path.splitext(upload_file.filename)[1] or ".xlsx"
-        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
-        tmp_path = tmp.name
-        tmp.close()
+    async def handle_upload_and_process(self, upload_file: UploadFile, output_format: Optional[str] = None, use_cache: bool = True) -> List[Dict[str, Any]]:
+        tmp_path = await save_upload(upload_file)
 
-        async with aiofiles.open(tmp_path, 'wb') as out:
-            await out.write(await upload_file.read())
+        try:
+            with run_timer() as timer:
+                results_path = await self.service.process_excel(tmp_path, output_format=output_format, use_cache=use_cache)
+            return {"output_file": results_path, "timing_summary": timer.summary()}
+        finally:
+            os.remove(tmp_path)
 
+    async def read_upload_for_streaming(self, upload_file: UploadFile) -> pd.DataFrame:
+        tmp_path = await save_upload(upload_file)
         try:
-            results_path = await self.service.process_excel(tmp_path)
-            return {"output_file": results_path}
+            return await self.service.read_excel(tmp_path)
         finally:
             os.remove(tmp_path)
 
-    async def shutdown(self):
-        await self.service.close()
+    async def stream_evaluations(self, df: pd.DataFrame, fmt: str = "ndjson", use_cache: bool = True) -> AsyncIterator[str]:
+        def _encode(event: str, data: Dict[str, Any]) -> str:
+            body = json.dumps(data, default=str)
+            if fmt == "sse":
+                return f"event: {event}\ndata: {body}\n\n"
+            return json.dumps({"event": event, **data}, default=str) + "\n"
 
-    async def handle_excel_read(self, upload_file: UploadFile) -> ExcelDataResponse:
-        suffix = os.path.splitext(upload_file.filename)[1] or ".xlsx"
-        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
-        tmp_path = tmp.name
-        tmp.close()
+        total = len(df)
+        completed = 0
+        failed = 0
+        async for idx, res in self.service.iter_evaluations(df, use_cache=use_cache):
+            completed += 1
+            if res.get("error"):
+                failed += 1
+            yield _encode("result", {
+                "row_index": idx.item() if hasattr(idx, "item") else idx,
+                "predicted_output": res.get("predicted_output"),
+                "judge": res.get("judge"),
+                "error": res.get("error"),
+                "completed": completed,
+                "total_rows": total,
+            })
+        yield _encode("done", {"total_rows": total, "completed": completed, "failed": failed})
+
+    async def save_upload_for_job(self, upload_file: UploadFile, job_id: str, output_format: Optional[str] = None, use_cache: bool = True) -> Dict[str, Any]:
+        os.makedirs(settings.jobs_input_dir, exist_ok=True)
+        input_path = await save_upload(upload_file, dest_path=os.path.join(settings.jobs_input_dir, job_id))
 
-        async with aiofiles.open(tmp_path, 'wb') as out:
-            await out.write(await upload_file.read())
+        base = os.path.splitext(os.path.basename(upload_file.filename or ""))[0] or job_id
+        return {"input_path": input_path, "output_filename": f"{base}_evaluated", "output_format": output_format, "use_cache": use_cache}
+
+    async def run_upload_job(self, params: Dict[str, Any], progress_callback: Callable[[int, int], None]) -> Dict[str, Any]:
+        input_path = params["input_path"]
+        if not os.path.exists(input_path):
+            raise ValueError(f"Job input file '{input_path}' no longer exists")
+        with run_timer() as timer:
+            results_path = await self.service.process_excel(
+                input_path,
+                output_filename=params.get("output_filename"),
+                progress_callback=progress_callback,
+                run_id=params["job_id"],
+                output_format=params.get("output_format"),
+                use_cache=params.get("use_cache", True),
+            )
+        os.remove(input_path)
+        self.service.discard_checkpoints(params["job_id"])
+        return {"output_file": results_path, "timing_summary": timer.summary()}
+
+    async def run_document_job(self, params: Dict[str, Any], progress_callback: Callable[[int, int], None]) -> Dict[str, Any]:
+        result = await self.process_document_by_id(params["document_id"], progress_callback=progress_callback, run_id=params["job_id"], output_format=params.get("output_format"), use_cache=params.get("use_cache", True))
+        self.service.discard_checkpoints(params["job_id"])
+        return result
+
+    async def handle_excel_read(self, upload_file: UploadFile) -> ExcelDataResponse:
+        tmp_path = await save_upload(upload_file)
 
         try:
-            excel_file = pd.ExcelFile(tmp_path)
-            sheet_names = excel_file.sheet_names
-            
-            all_data = []
-            uniform_records = []
-            
-            for sheet_name in sheet_names:
-                df = pd.read_excel(tmp_path, sheet_name=sheet_name)
-                df = df.fillna("")  # Replace NaN values to make JSON serializable
-                sheet_data = df.to_dict(orient='records')
-                for record in sheet_data:
-                    record['_sheet_name'] = sheet_name
-                    all_data.append(record)
-                    uniform_record = {
-                        "client_code": sheet_name,
-                        "transcript": record.get("transcript"),
-                        "lead_data": record.get("lead_data"),
-                        "latest_message": record.get("latest_message"),
-                        "expected_output": record.get("expected_output")
-                    }
-                    uniform_records.append(uniform_record)
+            sheet_names, all_data, uniform_records = await self.service.read_workbook(tmp_path)
             
             total_rows = len(all_data)
             
-            universal_data_store.add_uniform_records(uniform_records, source="excel_upload")
+            await async_data_store.add_uniform_records(uniform_records, source="excel_upload")
             
             return ExcelDataResponse(
                 data=all_data,
@@ -85,8 +143,8 @@ class EvalsController:
         finally:
             os.remove(tmp_path)
 
-    def handle_text_fields(self, fields_data: Dict[str, str]) -> TextFieldsResponse:
-        universal_data_store.add_uniform_record(
+    async def handle_text_fields(self, fields_data: Dict[str, str]) -> TextFieldsResponse:
+        await async_data_store.add_uniform_record(
             client_code=fields_data.get("client_code"),
             transcript=fields_data.get("transcript"),
             lead_data=fields_data.get("lead_data"),
@@ -99,8 +157,23 @@ class EvalsController:
             received_data=fields_data
         )
     
-    async def process_document_by_id(self, document_id: str) -> Dict[str, Any]:
-        doc = universal_data_store.get_document_by_id(document_id)
+    async def handle_bulk_ingest(self, chunks: AsyncIterator[bytes], content_type: str) -> BulkIngestResponse:
+        parser = BulkIngestParser()
+        async for batch in parser.batches(chunks, content_type):
+            await async_data_store.add_uniform_records(batch, source="bulk_ingest")
+
+        return BulkIngestResponse(
+            accepted=parser.accepted,
+            rejected=parser.rejected,
+            errors=parser.errors
+        )
+
+    async def process_document_by_id(self, document_id: str, progress_callback: Optional[Callable[[int, int], None]] = None, write_output: bool = True, run_id: Optional[str] = None, output_format: Optional[str] = None, use_cache: bool = True) -> Dict[str, Any]:
+        with run_timer() as timer:
+            return await self._process_document(document_id, timer, progress_callback, write_output, run_id, output_format, use_cache)
+
+    async def _process_document(self, document_id: str, timer: RunTimer, progress_callback: Optional[Callable[[int, int], None]], write_output: bool, run_id: Optional[str], output_format: Optional[str], use_cache: bool) -> Dict[str, Any]:
+        doc = await async_data_store.get_document_by_id(document_id)
         
         if not doc:
             raise ValueError(f"Document with ID '{document_id}' not found")
@@ -109,13 +182,15 @@ class EvalsController:
         
         if document_type == "excel_upload":
             records = doc.get("records", [])
-            output_filename = f"{document_id}_evaluated.xlsx"
+            output_filename = f"{document_id}_evaluated"
         elif document_type == "text_field_entry":
             records = [doc.get("entry", {})]
-            output_filename = f"{document_id}_evaluated.xlsx"
+            output_filename = f"{document_id}_evaluated"
         elif document_type == "universal_dataset":
-            records = doc.get("records", [])
-            output_filename = "universal_dataset_evaluated.xlsx"
+            records = []
+            async for batch in async_data_store.iter_universal_records():
+                records.extend(batch)
+            output_filename = "universal_dataset_evaluated"
         else:
             raise ValueError(f"Unknown document type: {document_type}")
         
@@ -126,40 +201,43 @@ class EvalsController:
                 "output_file": None
             }
         
-        df = pd.DataFrame(records)
+        evaluated_df = await self.service.evaluate_dataframe(pd.DataFrame(records), progress_callback=progress_callback, run_id=run_id, use_cache=use_cache)
         
-        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx")
-        tmp_path = tmp.name
-        tmp.close()
+        processed_records = dataframe_to_records(evaluated_df)
         
-        try:
-            df.to_excel(tmp_path, index=False, engine='openpyxl')
-            
-            results_path = await self.service.process_excel(tmp_path, output_filename=output_filename)
-            
-            processed_df = pd.read_excel(results_path, engine='openpyxl')
-            processed_df = processed_df.fillna("")  # Replace NaN values to make JSON serializable
-            processed_records = processed_df.to_dict(orient='records')
-            
-            output_document_id = universal_data_store.store_processed_output(
-                source_document_id=document_id,
-                processed_records=processed_records,
-                output_file_path=results_path
-            )
-            
-            return {
-                "success": True,
-                "message": f"Successfully processed {len(records)} records from document '{document_id}'",
-                "output_file": results_path,
-                "output_document_id": output_document_id,
-                "total_records": len(records)
-            }
-        finally:
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
+        # rows are stored before the file artifact, so a failed write never loses a paid-for run
+        output_document_id = await async_data_store.store_processed_output(
+            source_document_id=document_id,
+            processed_records=processed_records,
+            output_file_path="",
+            timing_summary=timer.summary()
+        )
+        
+        results_path = None
+        if write_output:
+            try:
+                results_path = await self.service.write_output(evaluated_df, output_filename, output_format)
+            except Exception as e:
+                logger.error("Could not write output file for '%s': %s", output_document_id, e)
+        
+        # saved again now that the summary includes the output_write stage
+        timing_summary = timer.summary()
+        await async_data_store.finish_output(output_document_id, results_path or "", timing_summary)
+        
+        return {
+            "success": True,
+            "message": f"Successfully processed {len(records)} records from document '{document_id}'",
+            "output_file": results_path,
+            "output_document_id": output_document_id,
+            "total_records": len(records),
+            "timing_summary": timing_summary
+        }
     
-    def list_all_documents(self) -> DocumentListResponse:
-        excel_uploads = universal_data_store.get_all_excel_uploads()
+    async def list_all_documents(self, limit: int = 100, excel_uploads_cursor: Optional[str] = None, text_field_entries_cursor: Optional[str] = None) -> DocumentListResponse:
+        (excel_uploads, excel_next), total_excel = await asyncio.gather(
+            async_data_store.list_document_summaries("excel_upload", limit=limit, after=excel_uploads_cursor),
+            async_data_store.count_documents("excel_upload")
+        )
         excel_summaries = []
         for doc in excel_uploads:
             summary = DocumentSummary(
@@ -171,7 +249,10 @@ class EvalsController:
             )
             excel_summaries.append(summary)
         
-        text_field_entries = universal_data_store.get_all_text_field_entries()
+        (text_field_entries, text_next), total_text = await asyncio.gather(
+            async_data_store.list_document_summaries("text_field_entry", limit=limit, after=text_field_entries_cursor),
+            async_data_store.count_documents("text_field_entry")
+        )
         text_field_summaries = []
         for doc in text_field_entries:
             summary = DocumentSummary(
@@ -183,7 +264,7 @@ class EvalsController:
             )
             text_field_summaries.append(summary)
         
-        universal_doc = universal_data_store.get_universal_dataset_from_mongo()
+        universal_doc = await async_data_store.get_universal_dataset_summary()
         universal_summary = None
         if universal_doc:
             universal_summary = DocumentSummary(
@@ -194,61 +275,175 @@ class EvalsController:
                 description=f"Universal dataset containing all {universal_doc.get('record_count', 0)} records"
             )
         
-        total_documents = len(excel_summaries) + len(text_field_summaries) + (1 if universal_summary else 0)
+        total_documents = total_excel + total_text + (1 if universal_summary else 0)
         
         return DocumentListResponse(
             total_documents=total_documents,
             excel_uploads=excel_summaries,
             text_field_entries=text_field_summaries,
-            universal_dataset=universal_summary
+            universal_dataset=universal_summary,
+            total_excel_uploads=total_excel,
+            total_text_field_entries=total_text,
+            excel_uploads_next_cursor=excel_next,
+            text_field_entries_next_cursor=text_next
         )
     
-    def get_document_by_id(self, document_id: str) -> DocumentDetailResponse:
-        doc = universal_data_store.get_document_by_id(document_id)
+    async def get_document_by_id(self, document_id: str) -> DocumentDetailResponse:
+        doc = await async_data_store.get_document_by_id(document_id)
         
         if not doc:
             raise ValueError(f"Document with ID '{document_id}' not found")
         
-        document_type = doc.get("document_type")
-        
-        if document_type == "excel_upload":
-            records = doc.get("records", [])
-            created_updated_at = doc.get("uploaded_at", "")
-        elif document_type == "text_field_entry":
-            records = [doc.get("entry", {})]
-            created_updated_at = doc.get("created_at", "")
-        elif document_type == "universal_dataset":
-            records = doc.get("records", [])
-            created_updated_at = doc.get("updated_at", "")
-        else:
-            records = []
-            created_updated_at = ""
+        created_updated_at, _, batches = _document_source(doc)
+        records = []
+        async for batch in batches:
+            records.extend(batch)
         
         return DocumentDetailResponse(
             document_id=document_id,
-            document_type=document_type,
+            document_type=doc.get("document_type"),
             created_updated_at=created_updated_at,
             record_count=len(records),
             records=records
         )
     
-    def get_output_by_id(self, output_document_id: str) -> OutputDetailResponse:
-        output_doc = universal_data_store.get_output_by_id(output_document_id)
+    async def stream_document(self, document_id: str, fmt: str) -> Dict[str, Any]:
+        """
+        Looks the document up front (so a missing one is still a 404) and
+        returns its records as encoded chunks, read from the cursor as sent.
+        """
+        doc = await async_data_store.get_document_by_id(document_id)
+        
+        if not doc:
+            raise ValueError(f"Document with ID '{document_id}' not found")
+        
+        created_updated_at, record_count, batches = _document_source(doc)
+        header = {
+            "document_id": document_id,
+            "document_type": doc.get("document_type"),
+            "created_updated_at": created_updated_at,
+            "record_count": record_count,
+            "message": "Document retrieved successfully"
+        }
+        return {
+            "chunks": stream_records(header, batches, "records", fmt),
+            "media_type": STREAM_MEDIA_TYPES[fmt],
+            "record_count": record_count
+        }
+    
+    async def get_record_by_id(self, record_id: str) -> UniversalDataRecord:
+        record = await async_data_store.get_record(record_id)
+        
+        if not record:
+            raise ValueError(f"Record with ID '{record_id}' not found")
+        
+        return UniversalDataRecord(**record)
+    
+    async def find_records_by_client_code(self, client_code: str, limit: int = 100) -> RecordListResponse:
+        records = await async_data_store.find_records_by_client_code(client_code, limit=limit)
+        return RecordListResponse(
+            client_code=client_code,
+            total_records=len(records),
+            records=[UniversalDataRecord(**r) for r in records]
+        )
+    
+    async def get_output_by_id(self, output_document_id: str, limit: int = 1000, after_row: Optional[int] = None, pass_fail: Optional[str] = None, score_below: Optional[float] = None) -> OutputDetailResponse:
+        output_doc = await async_data_store.get_output_by_id(output_document_id)
         
         if not output_doc:
             raise ValueError(f"Output document with ID '{output_document_id}' not found")
         
+        processed_records, next_after_row = await async_data_store.get_output_results(
+            output_document_id,
+            limit=limit,
+            after_row=after_row,
+            pass_fail=pass_fail,
+            score_below=score_below
+        )
+        
         return OutputDetailResponse(
             output_document_id=output_doc.get("output_document_id"),
             source_document_id=output_doc.get("source_document_id"),
             processed_at=output_doc.get("processed_at", ""),
             record_count=output_doc.get("record_count", 0),
             output_file_path=output_doc.get("output_file_path", ""),
-            processed_records=output_doc.get("processed_records", [])
+            processed_records=processed_records,
+            timing_summary=output_doc.get("timing_summary"),
+            next_after_row=next_after_row
         )
     
-    def list_all_outputs(self) -> OutputListResponse:
-        all_outputs = universal_data_store.get_all_outputs()
+    async def stream_output(self, output_document_id: str, fmt: str, pass_fail: Optional[str] = None, score_below: Optional[float] = None) -> Dict[str, Any]:
+        output_doc = await async_data_store.get_output_by_id(output_document_id)
+        
+        if not output_doc:
+            raise ValueError(f"Output document with ID '{output_document_id}' not found")
+        
+        header = {
+            "output_document_id": output_doc.get("output_document_id"),
+            "source_document_id": output_doc.get("source_document_id"),
+            "processed_at": output_doc.get("processed_at", ""),
+            "record_count": output_doc.get("record_count", 0),
+            "output_file_path": output_doc.get("output_file_path", ""),
+            "timing_summary": output_doc.get("timing_summary"),
+            "message": "Output retrieved successfully"
+        }
+        # the header keeps the output's total; X-Record-Count is what this stream sends
+        record_count = header["record_count"]
+        if pass_fail is not None or score_below is not None:
+            record_count = await async_data_store.count_output_results(output_document_id, pass_fail=pass_fail, score_below=score_below)
+        batches = async_data_store.iter_output_results(output_document_id, pass_fail=pass_fail, score_below=score_below)
+        return {
+            "chunks": stream_records(header, batches, "processed_records", fmt),
+            "media_type": STREAM_MEDIA_TYPES[fmt],
+            "record_count": record_count
+        }
+    
+    async def export_output(self, output_document_id: str, output_format: str) -> Dict[str, Any]:
+        """
+        Renders a stored output in `output_format` for download. CSV comes back
+        as a chunk iterator to stream; other formats are written to a temp
+        file that the caller deletes once sent.
+        """
+        writer = get_writer(output_format)
+        output_doc = await async_data_store.get_output_by_id(output_document_id)
+        if not output_doc:
+            raise LookupError(f"Output document with ID '{output_document_id}' not found")
+
+        records = []
+        async for batch in async_data_store.iter_output_results(output_document_id):
+            records.extend(batch)
+        df = pd.DataFrame(records)
+        return await self._export_frame(df, output_document_id, writer)
+
+    async def export_job_result(self, output_file: str, output_format: str) -> Dict[str, Any]:
+        writer = get_writer(output_format)
+        if not output_file or not os.path.exists(output_file):
+            raise LookupError(f"Job output file '{output_file}' no longer exists")
+
+        df = await self.service.read_output(output_file)
+        name = os.path.splitext(os.path.basename(output_file))[0]
+        return await self._export_frame(df, name, writer)
+
+    async def _export_frame(self, df: pd.DataFrame, name: str, writer) -> Dict[str, Any]:
+        export = {"filename": f"{name}{writer.extension}", "media_type": writer.media_type}
+        if isinstance(writer, CsvWriter):
+            export["chunks"] = writer.iter_chunks(df)
+            return export
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            export["path"] = await self.service.write_output(df, name, writer.name, directory=tmp_dir)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        export["cleanup_dir"] = tmp_dir
+        return export
+
+    async def list_all_outputs(self, limit: int = 100, cursor: Optional[str] = None) -> OutputListResponse:
+        (all_outputs, next_cursor), total_outputs = await asyncio.gather(
+            async_data_store.list_output_summaries(limit=limit, after=cursor),
+            async_data_store.count_outputs()
+        )
         
         output_summaries = []
         for output in all_outputs:
@@ -262,6 +457,7 @@ class EvalsController:
             output_summaries.append(summary)
         
         return OutputListResponse(
-            total_outputs=len(output_summaries),
-            outputs=output_summaries
+            total_outputs=total_outputs,
+            outputs=output_summaries,
+            next_cursor=next_cursor
         )
\ No newline at end of file
@@ -1,9 +1,15 @@
-from fastapi import APIRouter, UploadFile, File, Depends, Body, HTTPException
-from typing import Any, Dict
+from fastapi import APIRouter, UploadFile, File, Depends, Body, HTTPException, Request, Query
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from typing import Any, Dict, Optional
+import shutil
 
 from app.api.controllers.evals_controller import EvalsController
-from app.services.evals_service import EvalsService
+from app.core.serialization import STREAM_FORMAT_PATTERN
+from app.services.job_service import JobManager, JOB_COMPLETED
+from app.services.upload_service import UploadRejectedError
 from app.models.schema import (
+    BulkIngestResponse,
     TextFieldsInput, 
     TextFieldsResponse, 
     ExcelDataResponse, 
@@ -11,66 +17,163 @@ from app.models.schema import (
     DocumentListResponse,
     DocumentDetailResponse,
     OutputDetailResponse,
-    OutputListResponse
+    OutputListResponse,
+    RecordListResponse,
+    UniversalDataRecord,
+    JobSubmitResponse,
+    JobStatusResponse,
+    JobListResponse,
+    JobResultResponse
 )
 
 router = APIRouter(prefix="/api/evals", tags=["evals"])
 
-def get_controller() -> EvalsController:
-    service = EvalsService()
+OUTPUT_FORMAT_PATTERN = "^(parquet|arrow|csv|xlsx)$"
+
+def get_controller(request: Request) -> EvalsController:
+    service = request.app.state.resources.get_evals_service()
     return EvalsController(service=service)
 
+def get_job_manager(request: Request) -> JobManager:
+    return request.app.state.job_manager
+
+def _download_response(export: Dict[str, Any]):
+    headers = {"Content-Disposition": f'attachment; filename="{export["filename"]}"'}
+    if "chunks" in export:
+        return StreamingResponse(export["chunks"], media_type=export["media_type"], headers=headers)
+    return FileResponse(
+        export["path"],
+        media_type=export["media_type"],
+        headers=headers,
+        background=BackgroundTask(shutil.rmtree, export["cleanup_dir"], ignore_errors=True)
+    )
+
+def _stream_response(stream: Dict[str, Any]) -> StreamingResponse:
+    return StreamingResponse(
+        stream["chunks"],
+        media_type=stream["media_type"],
+        headers={"X-Record-Count": str(stream["record_count"])}
+    )
+
 @router.post("/run-evals-end-to-end")
 async def run_evals_end_to_end(
     file: UploadFile = File(...),
+    output_format: Optional[str] = Query(None, pattern=OUTPUT_FORMAT_PATTERN),
+    use_cache: bool = Query(True, description="Set to false to call the upstreams instead of reusing cached results"),
     controller: EvalsController = Depends(get_controller)
 ):
-    result = await controller.handle_upload_and_process(file)
-    await controller.shutdown()
-    return result
+    try:
+        result = await controller.handle_upload_and_process(file, output_format=output_format, use_cache=use_cache)
+        return result
+    except UploadRejectedError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+@router.post("/run-evals-end-to-end/stream")
+async def run_evals_end_to_end_stream(
+    file: UploadFile = File(...),
+    format: str = Query("ndjson", pattern="^(ndjson|sse)$"),
+    use_cache: bool = Query(True, description="Set to false to call the upstreams instead of reusing cached results"),
+    controller: EvalsController = Depends(get_controller)
+):
+    try:
+        df = await controller.read_upload_for_streaming(file)
+    except UploadRejectedError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(
+        controller.stream_evaluations(df, fmt=format, use_cache=use_cache),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.post("/read-excel", response_model=ExcelDataResponse)
 async def read_excel_file(
     file: UploadFile = File(...),
     controller: EvalsController = Depends(get_controller)
 ):
-    result = await controller.handle_excel_read(file)
-    return result
+    try:
+        result = await controller.handle_excel_read(file)
+        return result
+    except UploadRejectedError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
 
 @router.post("/text-fields", response_model=TextFieldsResponse)
 async def process_text_fields(
     fields: Dict[str, str] = Body(..., example={"client_code": "value1", "transcript": "value2", "lead_data": "value3", "latest_message": "value4", "expected_output": "value5"}),
     controller: EvalsController = Depends(get_controller)
 ):
-    result = controller.handle_text_fields(fields)
+    result = await controller.handle_text_fields(fields)
     return result
 
+@router.post("/ingest", response_model=BulkIngestResponse)
+async def bulk_ingest(
+    request: Request,
+    controller: EvalsController = Depends(get_controller)
+):
+    try:
+        return await controller.handle_bulk_ingest(request.stream(), request.headers.get("content-type", ""))
+    except UploadRejectedError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
 @router.get("/documents", response_model=DocumentListResponse)
 async def list_all_documents(
+    limit: int = Query(100, ge=1, le=1000),
+    excel_uploads_cursor: Optional[str] = None,
+    text_field_entries_cursor: Optional[str] = None,
     controller: EvalsController = Depends(get_controller)
 ):
-    result = controller.list_all_documents()
-    return result
+    try:
+        result = await controller.list_all_documents(
+            limit=limit,
+            excel_uploads_cursor=excel_uploads_cursor,
+            text_field_entries_cursor=text_field_entries_cursor
+        )
+        return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/documents/{document_id}", response_model=DocumentDetailResponse)
 async def get_document_by_id(
     document_id: str,
+    stream: Optional[str] = Query(None, pattern=STREAM_FORMAT_PATTERN, description="Stream records from the cursor as ndjson or json"),
     controller: EvalsController = Depends(get_controller)
 ):
     try:
-        result = controller.get_document_by_id(document_id)
+        if stream:
+            return _stream_response(await controller.stream_document(document_id, stream))
+        result = await controller.get_document_by_id(document_id)
         return result
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
+@router.get("/records", response_model=RecordListResponse)
+async def find_records(
+    client_code: str = Query(...),
+    limit: int = Query(100, ge=1, le=1000),
+    controller: EvalsController = Depends(get_controller)
+):
+    return await controller.find_records_by_client_code(client_code, limit=limit)
+
+@router.get("/records/{record_id}", response_model=UniversalDataRecord)
+async def get_record_by_id(
+    record_id: str,
+    controller: EvalsController = Depends(get_controller)
+):
+    try:
+        return await controller.get_record_by_id(record_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
 @router.post("/process_document/{document_id}", response_model=ProcessDatasetResponse)
 async def process_document_by_id(
     document_id: str,
+    write_output: bool = True,
+    output_format: Optional[str] = Query(None, pattern=OUTPUT_FORMAT_PATTERN),
+    use_cache: bool = Query(True, description="Set to false to call the upstreams instead of reusing cached results"),
     controller: EvalsController = Depends(get_controller)
 ):
     try:
-        result = await controller.process_document_by_id(document_id)
-        await controller.shutdown()
+        result = await controller.process_document_by_id(document_id, write_output=write_output, output_format=output_format, use_cache=use_cache)
         return result
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -80,18 +183,148 @@ async def process_document_by_id(
 
 @router.get("/outputs", response_model=OutputListResponse)
 async def list_all_outputs(
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
     controller: EvalsController = Depends(get_controller)
 ):
-    result = controller.list_all_outputs()
-    return result
+    try:
+        result = await controller.list_all_outputs(limit=limit, cursor=cursor)
+        return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/outputs/{output_document_id}/download")
+async def download_output(
+    output_document_id: str,
+    format: str = Query("xlsx", pattern=OUTPUT_FORMAT_PATTERN),
+    controller: EvalsController = Depends(get_controller)
+):
+    try:
+        export = await controller.export_output(output_document_id, format)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return _download_response(export)
 
 @router.get("/outputs/{output_document_id}", response_model=OutputDetailResponse)
 async def get_output_by_id(
     output_document_id: str,
+    limit: int = Query(1000, ge=1, le=10000),
+    after_row: Optional[int] = Query(None, ge=0),
+    pass_fail: Optional[str] = Query(None, pattern="^(pass|fail)$"),
+    score_below: Optional[float] = None,
+    stream: Optional[str] = Query(None, pattern=STREAM_FORMAT_PATTERN, description="Stream every matching row as ndjson or json; limit and after_row are ignored"),
     controller: EvalsController = Depends(get_controller)
 ):
     try:
-        result = controller.get_output_by_id(output_document_id)
+        if stream:
+            return _stream_response(
+                await controller.stream_output(output_document_id, stream, pass_fail=pass_fail, score_below=score_below)
+            )
+        result = await controller.get_output_by_id(
+            output_document_id,
+            limit=limit,
+            after_row=after_row,
+            pass_fail=pass_fail,
+            score_below=score_below
+        )
         return result
     except ValueError as e:
-        raise HTTPException(status_code=404, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.post("/jobs/run-evals-end-to-end", response_model=JobSubmitResponse)
+async def submit_run_evals_job(
+    file: UploadFile = File(...),
+    output_format: Optional[str] = Query(None, pattern=OUTPUT_FORMAT_PATTERN),
+    use_cache: bool = Query(True, description="Set to false to call the upstreams instead of reusing cached results"),
+    controller: EvalsController = Depends(get_controller),
+    jobs: JobManager = Depends(get_job_manager)
+):
+    job_id = jobs.new_job_id()
+    try:
+        params = await controller.save_upload_for_job(file, job_id, output_format=output_format, use_cache=use_cache)
+    except UploadRejectedError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    return jobs.submit("run_evals_end_to_end", params, job_id=job_id)
+
+@router.post("/jobs/process_document/{document_id}", response_model=JobSubmitResponse)
+async def submit_process_document_job(
+    document_id: str,
+    output_format: Optional[str] = Query(None, pattern=OUTPUT_FORMAT_PATTERN),
+    use_cache: bool = Query(True, description="Set to false to call the upstreams instead of reusing cached results"),
+    jobs: JobManager = Depends(get_job_manager)
+):
+    return jobs.submit("process_document", {"document_id": document_id, "output_format": output_format, "use_cache": use_cache})
+
+@router.get("/jobs", response_model=JobListResponse)
+async def list_jobs(
+    limit: int = 100,
+    jobs: JobManager = Depends(get_job_manager)
+):
+    all_jobs = jobs.list(limit=limit)
+    return JobListResponse(total_jobs=len(all_jobs), jobs=all_jobs)
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job_status(
+    job_id: str,
+    jobs: JobManager = Depends(get_job_manager)
+):
+    job = jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job with ID '{job_id}' not found")
+    return job
+
+@router.post("/jobs/{job_id}/resume", response_model=JobStatusResponse)
+async def resume_job(
+    job_id: str,
+    jobs: JobManager = Depends(get_job_manager)
+):
+    try:
+        return jobs.resume(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Job with ID '{job_id}' not found")
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.get("/jobs/{job_id}/result", response_model=JobResultResponse)
+async def get_job_result(
+    job_id: str,
+    jobs: JobManager = Depends(get_job_manager)
+):
+    job = jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job with ID '{job_id}' not found")
+    if job["status"] != JOB_COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Job '{job_id}' is {job['status']}: {job.get('error') or 'result not ready'}")
+    return JobResultResponse(job_id=job_id, status=job["status"], result=job["result"])
+
+@router.get("/jobs/{job_id}/result/download")
+async def download_job_result(
+    job_id: str,
+    format: str = Query("xlsx", pattern=OUTPUT_FORMAT_PATTERN),
+    controller: EvalsController = Depends(get_controller),
+    jobs: JobManager = Depends(get_job_manager)
+):
+    job = jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job with ID '{job_id}' not found")
+    if job["status"] != JOB_COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Job '{job_id}' is {job['status']}: {job.get('error') or 'result not ready'}")
+    try:
+        export = await controller.export_job_result((job["result"] or {}).get("output_file"), format)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return _download_response(export)
+
+
+@router.get("/cache/stats")
+async def get_cache_stats(request: Request) -> Dict[str, Any]:
+    cache = request.app.state.resources.result_cache
+    if cache is None:
+        return {"enabled": False}
+    return cache.stats()
+
+
+@router.get("/outbound/stats")
+async def get_outbound_stats(request: Request) -> Dict[str, Any]:
+    return request.app.state.resources.outbound_scheduler.snapshot()
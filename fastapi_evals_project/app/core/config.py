@@ -9,12 +9,50 @@ class Settings(BaseSettings):
     openai_model: str = os.getenv("OPENAI_MODEL", "")
     openai_base_url: str = os.getenv("OPENAI_BASE_URL", "")
     max_workers: int = int(os.getenv("MAX_WORKERS", "4"))
+    analyzer_concurrency: int = int(os.getenv("ANALYZER_CONCURRENCY", "8"))
+    judge_concurrency: int = int(os.getenv("JUDGE_CONCURRENCY", "4"))
+    judge_batch_size: int = int(os.getenv("JUDGE_BATCH_SIZE", "1"))
+    judge_batch_max_prompt_tokens: int = int(os.getenv("JUDGE_BATCH_MAX_PROMPT_TOKENS", "12000"))
+    judge_batch_output_tokens_per_item: int = int(os.getenv("JUDGE_BATCH_OUTPUT_TOKENS_PER_ITEM", "256"))
+    judge_batch_max_output_tokens: int = int(os.getenv("JUDGE_BATCH_MAX_OUTPUT_TOKENS", "4096"))
     request_timeout: int = int(os.getenv("REQUEST_TIMEOUT", "60"))
+    analyzer_rate_limit: float = float(os.getenv("ANALYZER_RATE_LIMIT", "20"))
+    analyzer_burst: int = int(os.getenv("ANALYZER_BURST", "20"))
+    judge_rate_limit: float = float(os.getenv("JUDGE_RATE_LIMIT", "5"))
+    judge_burst: int = int(os.getenv("JUDGE_BURST", "5"))
+    judge_tokens_per_minute: float = float(os.getenv("JUDGE_TOKENS_PER_MINUTE", "0"))
+    outbound_max_retries: int = int(os.getenv("OUTBOUND_MAX_RETRIES", "4"))
+    outbound_backoff_base: float = float(os.getenv("OUTBOUND_BACKOFF_BASE", "0.5"))
+    outbound_backoff_max: float = float(os.getenv("OUTBOUND_BACKOFF_MAX", "30"))
+    circuit_failure_threshold: int = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "10"))
+    circuit_reset_seconds: float = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+    http_max_connections: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+    http_max_keepalive_connections: int = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    http_keepalive_expiry: float = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+    http2_enabled: bool = os.getenv("HTTP2_ENABLED", "false").lower() == "true"
     mongo_uri: str = os.getenv("MONGO_URI", "")
     mongo_db_name: str = os.getenv("MONGO_DB_NAME", "")
     mongo_input_collection: str = os.getenv("MONGO_INPUT_COLLECTION", "")
     mongo_output_collection: str = os.getenv("MONGO_OUTPUT_COLLECTION", "")
+    mongo_thread_pool_size: int = int(os.getenv("MONGO_THREAD_POOL_SIZE", "8"))
+    max_upload_bytes: int = int(os.getenv("MAX_UPLOAD_BYTES", str(100 * 1024 * 1024)))
+    upload_chunk_size: int = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+    ingest_batch_size: int = int(os.getenv("INGEST_BATCH_SIZE", "1000"))
+    job_workers: int = int(os.getenv("JOB_WORKERS", "2"))
+    jobs_db_path: str = os.getenv("JOBS_DB_PATH", "outputs/jobs.sqlite3")
+    job_lease_seconds: float = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+    job_poll_interval: float = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "1.0"))
+    jobs_input_dir: str = os.getenv("JOBS_INPUT_DIR", "outputs/job_inputs")
+    result_cache_enabled: bool = os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true"
+    result_cache_path: str = os.getenv("RESULT_CACHE_PATH", "outputs/result_cache.sqlite3")
+    result_cache_ttl_seconds: int = int(os.getenv("RESULT_CACHE_TTL_SECONDS", "604800"))
+    result_cache_max_entries: int = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "100000"))
+    output_format: str = os.getenv("OUTPUT_FORMAT", "parquet")
+    checkpoints_enabled: bool = os.getenv("CHECKPOINTS_ENABLED", "true").lower() == "true"
+    checkpoint_db_path: str = os.getenv("CHECKPOINT_DB_PATH", "outputs/checkpoints.sqlite3")
     transcript_analyzer_url: str = os.getenv("TRANSCRIPT_ANALYZER_URL", "")
+    # part of the analyzer cache key: bump it when the analyzer changes behind the same URL
+    transcript_analyzer_version: str = os.getenv("TRANSCRIPT_ANALYZER_VERSION", "")
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,118 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+class Histogram:
+    """Minimal thread-safe Prometheus histogram with one label dimension set."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...], buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # labels -> (per-bucket counts, sum, count)
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(self, value: float, *labels: str):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(labels, list(s[0]), s[1], s[2]) for labels, s in sorted(self._series.items())]
+        for labels, bucket_counts, total, count in snapshot:
+            base = ",".join(f'{k}="{v}"' for k, v in zip(self.labelnames, labels))
+            sep = "," if base else ""
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                lines.append(f'{self.name}_bucket{{{base}{sep}le="{bound}"}} {bucket_count}')
+            lines.append(f'{self.name}_bucket{{{base}{sep}le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{base}}} {total}")
+            lines.append(f"{self.name}_count{{{base}}} {count}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    "evals_stage_duration_seconds",
+    "Wall time spent in each evaluation pipeline stage.",
+    labelnames=("stage",),
+)
+REGISTRY: List[Histogram] = [STAGE_SECONDS]
+
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+class RunTimer:
+    """Per-run totals of the same stages, saved alongside the run's output."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._stages: Dict[str, List[float]] = {}
+
+    def add(self, stage_name: str, seconds: float):
+        with self._lock:
+            entry = self._stages.setdefault(stage_name, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = {
+                name: {
+                    "count": count,
+                    "total_seconds": round(total, 6),
+                    "mean_seconds": round(total / count, 6),
+                    "max_seconds": round(longest, 6),
+                }
+                for name, (count, total, longest) in self._stages.items()
+            }
+        return {"wall_seconds": round(time.perf_counter() - self.started, 6), "stages": stages}
+
+
+_current_run: contextvars.ContextVar[Optional[RunTimer]] = contextvars.ContextVar(
+    "evals_run_timer", default=None
+)
+
+
+@contextmanager
+def run_timer() -> Iterator[RunTimer]:
+    """Collects every stage() timed in this context (and tasks spawned from it)."""
+    timer = RunTimer()
+    token = _current_run.set(timer)
+    try:
+        yield timer
+    finally:
+        _current_run.reset(token)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, name)
+        timer = _current_run.get()
+        if timer is not None:
+            timer.add(name, elapsed)
@@ -0,0 +1,57 @@
+import json
+from typing import Any, AsyncIterator, Dict, List, Type
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional: the stdlib encoder is used instead
+    orjson = None
+
+STREAM_FORMAT_PATTERN = "^(ndjson|json)$"
+STREAM_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "json": "application/json"}
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact JSON bytes; ObjectIds and other non-JSON values are written as strings."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, default=str, separators=(",", ":")).encode()
+
+
+def default_response_class() -> Type[JSONResponse]:
+    if orjson is not None:
+        from fastapi.responses import ORJSONResponse
+
+        return ORJSONResponse
+    return JSONResponse
+
+
+async def stream_records(
+    header: Dict[str, Any],
+    batches: AsyncIterator[List[Dict[str, Any]]],
+    records_key: str,
+    fmt: str,
+) -> AsyncIterator[bytes]:
+    """
+    Encodes record batches as they arrive:
+      - ndjson: one record per line
+      - json: `header` with the records as an array under `records_key`,
+        the same shape as the non-streaming response
+    """
+    if fmt == "ndjson":
+        async for batch in batches:
+            if batch:
+                yield b"".join(dumps(record) + b"\n" for record in batch)
+        return
+
+    # `header` is never empty, so dropping its closing brace leaves a valid prefix
+    yield dumps(header)[:-1] + b',"' + records_key.encode() + b'":['
+    first = True
+    async for batch in batches:
+        if not batch:
+            continue
+        body = b",".join(dumps(record) for record in batch)
+        yield body if first else b"," + body
+        first = False
+    yield b"]}"
@@ -0,0 +1,45 @@
+from typing import Any, Awaitable, Callable, Dict
+
+from fastapi.responses import JSONResponse
+
+# room for multipart boundaries and part headers on top of the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+Scope = Dict[str, Any]
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Rejects multipart uploads whose declared Content-Length is over the limit
+    with a 413 before any of the body is read. Starlette spools the whole form
+    to disk before a route runs, so save_upload's own check only catches
+    oversized uploads after they were received.
+
+    Requests without a Content-Length (chunked transfer encoding) still get
+    through to save_upload, so a hard cap on what is received needs a body
+    size limit at the server or proxy in front of the app (e.g. nginx
+    `client_max_body_size`).
+    """
+
+    def __init__(self, app: Callable[[Scope, Receive, Send], Awaitable[None]], max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http":
+            headers = dict(scope["headers"])
+            content_length = headers.get(b"content-length", b"")
+            if (
+                headers.get(b"content-type", b"").startswith(b"multipart/form-data")
+                and content_length.isdigit()
+                and int(content_length) > self.max_bytes + MULTIPART_OVERHEAD_BYTES
+            ):
+                response = JSONResponse(
+                    {"detail": f"Upload exceeds the maximum size of {self.max_bytes} bytes"},
+                    status_code=413,
+                )
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
@@ -26,7 +26,7 @@ class ExcelDataResponse(BaseModel):
     message: str = "Excel data extracted successfully"
 
 class UniversalDataRecord(BaseModel):
-    id: int
+    id: str
     timestamp: str
     source: str
     client_code: Optional[str] = None
@@ -35,12 +35,25 @@ class UniversalDataRecord(BaseModel):
     latest_message: Optional[str] = None
     expected_output: Optional[str] = None
 
+class RecordListResponse(BaseModel):
+    client_code: str
+    total_records: int
+    records: List[UniversalDataRecord]
+    message: str = "Records retrieved successfully"
+
 class ProcessDatasetResponse(BaseModel):
     success: bool
     message: str
     output_file: Optional[str]
     output_document_id: Optional[str] = None
     total_records: Optional[int] = None
+    timing_summary: Optional[Dict[str, Any]] = None
+
+class BulkIngestResponse(BaseModel):
+    accepted: int
+    rejected: int
+    errors: List[str] = []
+    message: str = "Records ingested successfully"
 
 class DocumentSummary(BaseModel):
     document_id: str
@@ -55,6 +68,10 @@ class DocumentListResponse(BaseModel):
     excel_uploads: List[DocumentSummary]
     text_field_entries: List[DocumentSummary]
     universal_dataset: Optional[DocumentSummary] = None
+    total_excel_uploads: int = 0
+    total_text_field_entries: int = 0
+    excel_uploads_next_cursor: Optional[str] = None
+    text_field_entries_next_cursor: Optional[str] = None
     message: str = "Documents retrieved successfully"
 
 
@@ -74,10 +91,45 @@ class OutputDetailResponse(BaseModel):
     record_count: int
     output_file_path: str
     processed_records: List[Dict[str, Any]]
+    timing_summary: Optional[Dict[str, Any]] = None
+    next_after_row: Optional[int] = None
     message: str = "Output retrieved successfully"
 
 
 class OutputListResponse(BaseModel):
     total_outputs: int
     outputs: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
     message: str = "Outputs retrieved successfully"
+
+
+
+class JobSubmitResponse(BaseModel):
+    job_id: str
+    job_type: str
+    status: str
+    message: str = "Job submitted successfully"
+
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    job_type: str
+    status: str
+    progress_done: int
+    progress_total: int
+    created_at: str
+    updated_at: str
+    error: Optional[str] = None
+
+
+class JobListResponse(BaseModel):
+    total_jobs: int
+    jobs: List[JobStatusResponse]
+    message: str = "Jobs retrieved successfully"
+
+
+class JobResultResponse(BaseModel):
+    job_id: str
+    status: str
+    result: Dict[str, Any]
+    message: str = "Job result retrieved successfully"
@@ -0,0 +1,170 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import stage
+from app.services.data_store import (
+    UniversalDataStore,
+    output_results_batch_size,
+    universal_data_store,
+    universal_records_batch_size,
+)
+
+
+def read_batch(batches: Iterator[List[Dict[str, Any]]]) -> Optional[List[Dict[str, Any]]]:
+    return next(batches, None)
+
+
+class AsyncUniversalDataStore:
+    """
+    Async facade over UniversalDataStore with the same method names.
+    Each call runs on a dedicated thread pool so pymongo round trips and
+    Excel exports never block the event loop.
+    """
+
+    def __init__(self, store: UniversalDataStore, max_workers: Optional[int] = None):
+        self.store = store
+        self.max_workers = max_workers or settings.mongo_thread_pool_size
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                self.max_workers, thread_name_prefix="data-store"
+            )
+        return self._executor
+
+    async def _run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        with stage(f"mongo_{fn.__name__}"):
+            return await loop.run_in_executor(self._get_executor(), partial(fn, *args, **kwargs))
+
+    async def add_uniform_record(self, **kwargs: Any):
+        return await self._run(self.store.add_uniform_record, **kwargs)
+
+    async def add_uniform_records(self, records: List[Dict[str, Any]], source: str = "unknown"):
+        return await self._run(self.store.add_uniform_records, records, source=source)
+
+    async def insert_batch_into_mongodb(self):
+        return await self._run(self.store.insert_batch_into_mongodb)
+
+    async def clear_data(self):
+        return await self._run(self.store.clear_data)
+
+    async def get_export_file_path(self) -> str:
+        return await self._run(self.store.get_export_file_path)
+
+    async def get_excel_file_path(self) -> str:
+        return await self._run(self.store.get_excel_file_path)
+
+    async def migrate_legacy_universal_dataset(self) -> int:
+        return await self._run(self.store.migrate_legacy_universal_dataset)
+
+    async def iter_universal_records(self, batch_size: int = universal_records_batch_size) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Batches from one Mongo cursor; each batch is fetched on the thread pool."""
+        batches = self.store.iter_universal_records(batch_size)
+        while True:
+            batch = await self._run(read_batch, batches)
+            if batch is None:
+                return
+            yield batch
+
+    async def hydrate(self) -> int:
+        return await self._run(self.store.hydrate)
+
+    async def get_record(self, record_id: str) -> Optional[Dict[str, Any]]:
+        return await self._run(self.store.get_record, record_id)
+
+    async def find_records_by_client_code(self, client_code: str, limit: int = 100) -> List[Dict[str, Any]]:
+        return await self._run(self.store.find_records_by_client_code, client_code, limit=limit)
+
+    async def insert_single_record_into_mongodb(self, entry: Dict[str, Any]):
+        return await self._run(self.store.insert_single_record_into_mongodb, entry)
+
+    async def get_document_by_id(self, document_id: str) -> Dict[str, Any]:
+        return await self._run(self.store.get_document_by_id, document_id)
+
+    async def get_all_excel_uploads(self) -> List[Dict[str, Any]]:
+        return await self._run(self.store.get_all_excel_uploads)
+
+    async def get_all_text_field_entries(self) -> List[Dict[str, Any]]:
+        return await self._run(self.store.get_all_text_field_entries)
+
+    async def store_processed_output(self, source_document_id: str, processed_records: List[Dict[str, Any]], output_file_path: str, timing_summary: Optional[Dict[str, Any]] = None) -> str:
+        return await self._run(
+            self.store.store_processed_output,
+            source_document_id,
+            processed_records,
+            output_file_path,
+            timing_summary,
+        )
+
+    async def finish_output(self, output_document_id: str, output_file_path: str, timing_summary: Optional[Dict[str, Any]] = None):
+        return await self._run(self.store.finish_output, output_document_id, output_file_path, timing_summary)
+
+    async def get_output_by_id(self, output_document_id: str) -> Dict[str, Any]:
+        return await self._run(self.store.get_output_by_id, output_document_id)
+
+    async def get_output_results(self, output_document_id: str, limit: int = 1000, after_row: Optional[int] = None, pass_fail: Optional[str] = None, score_below: Optional[float] = None) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        return await self._run(
+            self.store.get_output_results,
+            output_document_id,
+            limit=limit,
+            after_row=after_row,
+            pass_fail=pass_fail,
+            score_below=score_below,
+        )
+
+    async def count_output_results(self, output_document_id: str, pass_fail: Optional[str] = None, score_below: Optional[float] = None) -> int:
+        return await self._run(self.store.count_output_results, output_document_id, pass_fail, score_below)
+
+    async def iter_output_results(self, output_document_id: str, batch_size: int = output_results_batch_size, pass_fail: Optional[str] = None, score_below: Optional[float] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        batches = self.store.iter_output_results(output_document_id, batch_size, pass_fail=pass_fail, score_below=score_below)
+        while True:
+            batch = await self._run(read_batch, batches)
+            if batch is None:
+                return
+            yield batch
+
+    async def migrate_legacy_outputs(self) -> int:
+        return await self._run(self.store.migrate_legacy_outputs)
+
+    async def get_all_outputs(self) -> List[Dict[str, Any]]:
+        return await self._run(self.store.get_all_outputs)
+
+    async def ensure_indexes(self):
+        return await self._run(self.store.ensure_indexes)
+
+    async def list_document_summaries(self, document_type: str, limit: int = 100, after: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        return await self._run(self.store.list_document_summaries, document_type, limit=limit, after=after)
+
+    async def count_documents(self, document_type: str) -> int:
+        return await self._run(self.store.count_documents, document_type)
+
+    async def get_universal_dataset_summary(self) -> Optional[Dict[str, Any]]:
+        return await self._run(self.store.get_universal_dataset_summary)
+
+    async def list_output_summaries(self, limit: int = 100, after: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        return await self._run(self.store.list_output_summaries, limit=limit, after=after)
+
+    async def count_outputs(self) -> int:
+        return await self._run(self.store.count_outputs)
+
+    async def flush_writes(self) -> int:
+        return await self._run(self.store.flush_writes)
+
+    def start_write_behind(self):
+        self.store.start_write_behind()
+
+    async def stop_write_behind(self):
+        return await self._run(self.store.stop_write_behind)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+async_data_store = AsyncUniversalDataStore(universal_data_store)
@@ -0,0 +1,71 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+
+class CheckpointStore:
+    """
+    Append-only per-row checkpoints for long evaluation runs.
+      - rows are keyed by (run_id, row_hash), the hash being the sha256 of
+        the row's canonical JSON, so a resumed run matches rows by content
+        rather than by position
+      - only rows that finished without an error are recorded, so a resume
+        retries the failed ones
+      - a run's checkpoints are dropped once its output has been written
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    run_id TEXT NOT NULL,
+                    row_hash TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (run_id, row_hash)
+                )
+                """
+            )
+
+    @staticmethod
+    def row_hash(row: Dict[str, Any]) -> str:
+        canonical = json.dumps(row, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def load(self, run_id: str) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT row_hash, result FROM checkpoints WHERE run_id = ?", (run_id,)
+            ).fetchall()
+        return {row_hash: json.loads(result) for row_hash, result in rows}
+
+    def save_many(self, run_id: str, entries: List[Tuple[str, Dict[str, Any]]]):
+        """Records (row_hash, result) pairs in one transaction."""
+        now = time.time()
+        rows = [(run_id, row_hash, json.dumps(result, default=str), now) for row_hash, result in entries]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO checkpoints (run_id, row_hash, result, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+    def discard(self, run_id: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM checkpoints WHERE run_id = ?", (run_id,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
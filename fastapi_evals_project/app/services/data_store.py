@@ -1,79 +1,243 @@
-from typing import List, Dict, Any
+from typing import Iterator, List, Dict, Any, Optional, Tuple
 from datetime import datetime
+from functools import lru_cache
+import logging
 import pandas as pd
 import os
-from pymongo import MongoClient
+import threading
+import time
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ASCENDING, DESCENDING, InsertOne, MongoClient, UpdateOne
+from pymongo.collection import Collection
+from pymongo.errors import BulkWriteError
 import certifi
 import uuid
 from dotenv import load_dotenv
 
+from app.services.output_writers import get_writer, with_extension
+from app.services.record_index import RecordIndex, cell_text, new_record_id, normalize_record
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 mongo_uri = os.getenv("MONGO_URI", "")
 mongo_db_name = os.getenv("MONGO_DB_NAME", "")
 mongo_input_collection = os.getenv("MONGO_INPUT_COLLECTION", "")
 mongo_output_collection = os.getenv("MONGO_OUTPUT_COLLECTION", "")
+mongo_records_collection = os.getenv("MONGO_RECORDS_COLLECTION", "universal_records")
+mongo_output_results_collection = os.getenv("MONGO_OUTPUT_RESULTS_COLLECTION", "output_results")
+dataset_export_format = os.getenv("DATASET_EXPORT_FORMAT", "parquet")
+write_behind_max_records = int(os.getenv("WRITE_BEHIND_MAX_RECORDS", "1000"))
+write_behind_interval = float(os.getenv("WRITE_BEHIND_INTERVAL_SECONDS", "1.0"))
+record_index_max_records = int(os.getenv("RECORD_INDEX_MAX_RECORDS", "50000"))
+universal_records_batch_size = int(os.getenv("UNIVERSAL_RECORDS_BATCH_SIZE", "1000"))
+output_results_batch_size = int(os.getenv("OUTPUT_RESULTS_BATCH_SIZE", "1000"))
+
+UNIVERSAL_DATASET_ID = "universal_dataset_main"
+# universal dataset records are stored one document each; _id only orders them
+RECORD_PROJECTION = {"_id": 0}
+# output result rows: only the evaluated record goes back to callers
+RESULT_PROJECTION = {"_id": 0, "row": 1, "record": 1}
+
+
+# listing queries only ever need these fields, never the records payload
+DOCUMENT_SUMMARY_PROJECTION = {
+    "_id": 1,
+    "document_id": 1,
+    "document_type": 1,
+    "uploaded_at": 1,
+    "created_at": 1,
+    "updated_at": 1,
+    "record_count": 1
+}
+OUTPUT_SUMMARY_PROJECTION = {
+    "_id": 1,
+    "output_document_id": 1,
+    "source_document_id": 1,
+    "processed_at": 1,
+    "record_count": 1,
+    "output_file_path": 1
+}
+
+
+def _page_query(query: Dict[str, Any], after: Optional[str]) -> Dict[str, Any]:
+    if not after:
+        return query
+    try:
+        return {**query, "_id": {"$gt": ObjectId(after)}}
+    except (InvalidId, TypeError):
+        raise ValueError(f"Invalid pagination cursor '{after}'")
+
+
+def _split_page(docs: List[Dict[str, Any]], limit: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    if len(docs) > limit:
+        docs = docs[:limit]
+        return docs, str(docs[-1]["_id"])
+    return docs, None
+
+
+def _result_document(output_document_id: str, row: int, record: Dict[str, Any]) -> Dict[str, Any]:
+    # filterable fields are lifted out of the record so they can be indexed;
+    # dataframe_to_records blanks missing values to ""
+    score = record.get("score_overall")
+    pass_fail = record.get("pass_fail")
+    return {
+        "output_document_id": output_document_id,
+        "row": row,
+        "pass_fail": pass_fail or None,
+        "score_overall": score if isinstance(score, (int, float)) and not isinstance(score, bool) else None,
+        "record": record
+    }
+
+
+def _results_query(output_document_id: str, after_row: Optional[int], pass_fail: Optional[str], score_below: Optional[float]) -> Dict[str, Any]:
+    query: Dict[str, Any] = {"output_document_id": output_document_id}
+    if after_row is not None:
+        query["row"] = {"$gt": after_row}
+    if pass_fail is not None:
+        query["pass_fail"] = pass_fail
+    if score_below is not None:
+        query["score_overall"] = {"$lt": score_below}
+    return query
+
+
+@lru_cache(maxsize=1)
+def get_default_collections() -> Tuple[Collection, Collection]:
+    client = MongoClient(
+        mongo_uri,
+        tls=True,
+        tlsCAFile=certifi.where()
+    )
+    db = client[mongo_db_name]
+    return db[mongo_input_collection], db[mongo_output_collection]
 
-client = MongoClient(
-    mongo_uri,
-    tls=True,
-    tlsCAFile=certifi.where()
-)
-db = client[mongo_db_name]
-input_collection = db[mongo_input_collection]
-output_collection = db[mongo_output_collection]
 
 class UniversalDataStore:
+    """
+    Synchronous store over the input/output Mongo collections.
+    Collections are injectable (e.g. mongomock) and default to the
+    configured Atlas cluster, connected on first use rather than at import.
+    """
     
-    def __init__(self, excel_file_path: str = "outputs/universal_dataset.xlsx"):
-        self._data: List[Dict[str, Any]] = []
+    def __init__(self,
+        excel_file_path: str = "outputs/universal_dataset.xlsx",
+        export_format: str = dataset_export_format,
+        flush_max_records: int = write_behind_max_records,
+        flush_interval: float = write_behind_interval,
+        max_records: int = record_index_max_records,
+        input_collection: Optional[Collection] = None,
+        output_collection: Optional[Collection] = None,
+        records_collection: Optional[Collection] = None,
+        output_results_collection: Optional[Collection] = None):
+        self._input_collection = input_collection
+        self._output_collection = output_collection
+        self._records_collection = records_collection
+        self._output_results_collection = output_results_collection
+        # guards the write buffers when the store is driven from a thread pool
+        self._lock = threading.RLock()
+        # by-id cache of the newest `max_records` records; Mongo (written via the
+        # write-behind buffer) stays the source of truth for every other read
+        self._records = RecordIndex(max_records)
         self.excel_file_path = excel_file_path
+        # dataset exports (Parquet by default, or Excel) are only built when
+        # asked for and the dataset changed since the file was written
+        self._export_writer = get_writer(export_format)
+        self.export_file_path = with_extension(excel_file_path, self._export_writer)
+        self._export_lock = threading.Lock()
+        # write-behind: text-field documents and universal-dataset records are
+        # buffered and sent as unordered bulk_writes once `flush_max_records`
+        # are pending or every `flush_interval` seconds. Until
+        # start_write_behind() runs, every write is flushed immediately.
+        self.flush_max_records = max(1, flush_max_records)
+        self.flush_interval = flush_interval
+        self._pending_documents: List[Dict[str, Any]] = []
+        self._pending_records: List[Dict[str, Any]] = []
+        self._flush_lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        self._stop_flusher = threading.Event()
         os.makedirs(os.path.dirname(excel_file_path), exist_ok=True)
     
-    def add_uniform_record(self, 
+    @property
+    def input_collection(self) -> Collection:
+        if self._input_collection is None:
+            self._input_collection = get_default_collections()[0]
+        return self._input_collection
+    
+    @property
+    def output_collection(self) -> Collection:
+        if self._output_collection is None:
+            self._output_collection = get_default_collections()[1]
+        return self._output_collection
+    
+    @property
+    def records_collection(self) -> Collection:
+        """One document per universal dataset record, next to the input collection."""
+        if self._records_collection is None:
+            self._records_collection = self.input_collection.database[mongo_records_collection]
+        return self._records_collection
+    
+    @property
+    def output_results_collection(self) -> Collection:
+        """One document per evaluated row, keyed by (output_document_id, row)."""
+        if self._output_results_collection is None:
+            self._output_results_collection = self.output_collection.database[mongo_output_results_collection]
+        return self._output_results_collection
+    
+    def _build_entry(self,
         client_code: str = None,
         transcript: str = None,
         lead_data: str = None,
         latest_message: str = None,
         expected_output: str = None,
-        source: str = "unknown",
-        update_mongo: bool = True):
-        entry = {
-            "id": len(self._data) + 1,
+        source: str = "unknown") -> Dict[str, Any]:
+        return {
+            "id": new_record_id(),
             "timestamp": datetime.now().isoformat(),
             "source": source,
-            "client_code": client_code,
-            "transcript": transcript,
-            "lead_data": lead_data,
-            "latest_message": latest_message,
-            "expected_output": expected_output
+            "client_code": cell_text(client_code),
+            "transcript": cell_text(transcript),
+            "lead_data": cell_text(lead_data),
+            "latest_message": cell_text(latest_message),
+            "expected_output": cell_text(expected_output)
         }
-        self._data.append(entry)
+    
+    def add_uniform_record(self, 
+        client_code: str = None,
+        transcript: str = None,
+        lead_data: str = None,
+        latest_message: str = None,
+        expected_output: str = None,
+        source: str = "unknown",
+        update_mongo: bool = True):
+        entry = self._build_entry(client_code, transcript, lead_data, latest_message, expected_output, source)
+        self._records.add([entry])
         
+        documents = []
         if source == "text_fields":
-            self._insert_text_field_document(entry)
+            documents.append(self._build_text_field_document(entry))
             
-        self._update_excel_file()
-        
-        if update_mongo:
-            self.insert_batch_into_mongodb()
+        self._enqueue_writes(documents, [entry] if update_mongo else [])
     
     def add_uniform_records(self, records: List[Dict[str, Any]], source: str = "unknown"):
+        entries = []
         for record in records:
-            self.add_uniform_record(
+            entry = self._build_entry(
                 client_code=record.get("client_code"),
                 transcript=record.get("transcript"),
                 lead_data=record.get("lead_data"),
                 latest_message=record.get("latest_message"),
                 expected_output=record.get("expected_output"),
-                source=source,
-                update_mongo=False  
+                source=source
             )
+            entries.append(entry)
+        self._records.add(entries)
         
         if source == "excel_upload":
             self._insert_excel_upload_document(records)
         
-        self.insert_batch_into_mongodb()
+        self._enqueue_writes([], entries)
     
     def _insert_excel_upload_document(self, records: List[Dict[str, Any]]):
         document_id = f"excel_upload_{uuid.uuid4().hex[:12]}"
@@ -85,71 +249,263 @@ class UniversalDataStore:
             "record_count": len(records),
             "records": records
         }
-        input_collection.insert_one(excel_doc)
+        self.input_collection.insert_one(excel_doc)
         return document_id
     
-    def _insert_text_field_document(self, entry: Dict[str, Any]):
-        document_id = f"text_field_{uuid.uuid4().hex[:12]}"
-        
-        text_field_doc = {
-            "document_id": document_id,
+    def _build_text_field_document(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "document_id": f"text_field_{uuid.uuid4().hex[:12]}",
             "document_type": "text_field_entry",
             "created_at": datetime.now().isoformat(),
             "entry": entry
         }
-        input_collection.insert_one(text_field_doc)
-        return document_id
     
-    def insert_batch_into_mongodb(self):
-        if not self._data:
-            return
-        
-        universal_doc = {
-            "document_id": "universal_dataset_main",
-            "document_type": "universal_dataset",
-            "updated_at": datetime.now().isoformat(),
-            "record_count": len(self._data),
-            "records": self._data
-        }
-        
-        input_collection.update_one(
-            {"document_type": "universal_dataset"},  
-            {"$set": universal_doc},                  
-            upsert=True                             
+    def _upsert_record_operation(self, entry: Dict[str, Any]) -> UpdateOne:
+        # keyed on the record id so a retried flush never duplicates a record
+        return UpdateOne({"id": entry["id"]}, {"$setOnInsert": dict(entry)}, upsert=True)
+    
+    def _manifest_operation(self) -> UpdateOne:
+        """Upserts the universal dataset manifest: counts only, never the records themselves."""
+        return UpdateOne(
+            {"document_type": "universal_dataset"},
+            {
+                "$set": {
+                    "updated_at": datetime.now().isoformat(),
+                    "record_count": self.records_collection.estimated_document_count(),
+                    "records_collection": self.records_collection.name
+                },
+                "$setOnInsert": {"document_id": UNIVERSAL_DATASET_ID}
+            },
+            upsert=True
         )
     
+    def _enqueue_writes(self, documents: List[Dict[str, Any]], records: List[Dict[str, Any]]):
+        if not documents and not records:
+            return
+        with self._lock:
+            self._pending_documents.extend(documents)
+            self._pending_records.extend(records)
+            pending = len(self._pending_documents) + len(self._pending_records)
+        if self._flusher is None or pending >= self.flush_max_records:
+            self.flush_writes()
+    
+    def flush_writes(self) -> int:
+        """Writes everything buffered, one unordered bulk_write per collection; returns how many items were sent."""
+        with self._flush_lock:
+            with self._lock:
+                documents, self._pending_documents = self._pending_documents, []
+                records, self._pending_records = self._pending_records, []
+            if not documents and not records:
+                return 0
+            
+            if records:
+                # documents are re-queued too if this raises, they haven't been sent yet
+                self._bulk_write(self.records_collection, [self._upsert_record_operation(r) for r in records], documents, records)
+            operations = [InsertOne(doc) for doc in documents]
+            if records:
+                operations.append(self._manifest_operation())
+            if operations:
+                self._bulk_write(self.input_collection, operations, documents, [])
+            return len(documents) + len(records)
+    
+    def _bulk_write(self, collection: Collection, operations: List[Any], documents: List[Dict[str, Any]], records: List[Dict[str, Any]]):
+        try:
+            collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            # unordered: everything without a write error was applied, so nothing is re-queued
+            logger.error("Write-behind flush partially failed: %s", e.details.get("writeErrors"))
+        except Exception:
+            # record upserts are idempotent, so re-sending a partly applied batch is safe
+            with self._lock:
+                self._pending_documents[:0] = documents
+                self._pending_records[:0] = records
+            raise
+    
+    def start_write_behind(self):
+        if self._flusher is not None:
+            return
+        self._stop_flusher.clear()
+        self._flusher = threading.Thread(target=self._flush_loop, name="data-store-write-behind", daemon=True)
+        self._flusher.start()
+    
+    def stop_write_behind(self):
+        if self._flusher is None:
+            return
+        self._stop_flusher.set()
+        self._flusher.join()
+        self._flusher = None
+        self.flush_writes()
+    
+    def _flush_loop(self):
+        while not self._stop_flusher.wait(self.flush_interval):
+            try:
+                self.flush_writes()
+            except Exception as e:
+                logger.warning("Write-behind flush failed, will retry: %s", e)
+    
+    def insert_batch_into_mongodb(self):
+        """Every record is already its own document; this only drains the write-behind buffer."""
+        self.flush_writes()
+    
     def clear_data(self):
-        self._data = []
-        if os.path.exists(self.excel_file_path):
-            os.remove(self.excel_file_path)
+        with self._lock:
+            self._records.clear()
+            for path in {self.export_file_path, self.excel_file_path}:
+                if os.path.exists(path):
+                    os.remove(path)
+    
+    def _dataset_records(self) -> List[Dict[str, Any]]:
+        # always from Mongo: other workers write to the same dataset and export file
+        return [record for batch in self.iter_universal_records() for record in batch]
+    
+    def _export_is_stale(self, path: str) -> bool:
+        if not os.path.exists(path):
+            return True
+        manifest = self.get_universal_dataset_summary()
+        if manifest is None:
+            return False
+        try:
+            updated_at = datetime.fromisoformat(manifest.get("updated_at") or "").timestamp()
+        except ValueError:
+            return True
+        # the file's mtime is when its snapshot was read, see _write_export
+        return updated_at >= os.path.getmtime(path)
     
-    def _update_excel_file(self):
-        if self._data:
-            df = pd.DataFrame(self._data)
-            df.to_excel(self.excel_file_path, index=False, engine='openpyxl')
+    def _write_export(self, writer: Any, path: str) -> str:
+        """
+        Rebuilds the export at `path` only if the dataset changed since it was
+        written. The file is written under a temp name and renamed into place,
+        so readers (and other workers sharing the path) never see a partial file.
+        """
+        with self._export_lock:
+            if not self._export_is_stale(path):
+                return path
+            started = time.time()
+            data = self._dataset_records()
+            base, extension = os.path.splitext(path)
+            tmp_path = f"{base}.{uuid.uuid4().hex[:8]}.tmp{extension}"
+            try:
+                writer.write(pd.DataFrame(data), tmp_path)
+                os.utime(tmp_path, (started, started))
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        return path
+    
+    def get_export_file_path(self) -> str:
+        return self._write_export(self._export_writer, self.export_file_path)
     
     def get_excel_file_path(self) -> str:
-        return self.excel_file_path
+        return self._write_export(get_writer("xlsx"), self.excel_file_path)
 
+    def migrate_legacy_universal_dataset(self, batch_size: int = universal_records_batch_size) -> int:
+        """
+        Moves the `records` array of a pre-split universal dataset document into
+        the records collection and drops it from the manifest; returns how many
+        records were moved. Safe to re-run: records are upserted by id.
+        """
+        doc = self.input_collection.find_one(
+            {"document_id": UNIVERSAL_DATASET_ID, "records": {"$exists": True}},
+            {"records": 1}
+        )
+        if not doc:
+            return 0
+        legacy = doc.get("records") or []
+        for start in range(0, len(legacy), batch_size):
+            operations = []
+            for position, entry in enumerate(legacy[start:start + batch_size], start):
+                record = normalize_record(entry)
+                # integer ids restarted at 1 per process and collide; ULIDs are kept
+                if len(record.get("id") or "") != 26:
+                    record["legacy_id"] = record.get("id")
+                    record["id"] = f"legacy-{position:08d}"
+                operations.append(self._upsert_record_operation(record))
+            self.records_collection.bulk_write(operations, ordered=False)
+        self.input_collection.update_one(
+            {"_id": doc["_id"]},
+            {
+                "$unset": {"records": ""},
+                "$set": {
+                    "record_count": self.records_collection.estimated_document_count(),
+                    "records_collection": self.records_collection.name
+                }
+            }
+        )
+        logger.info("Moved %d universal dataset records into '%s'", len(legacy), self.records_collection.name)
+        return len(legacy)
+    
+    def hydrate(self) -> int:
+        """Loads the newest records of the universal dataset into memory; returns how many."""
+        cursor = (
+            self.records_collection
+            .find({}, RECORD_PROJECTION)
+            .sort("_id", DESCENDING)
+            .limit(self._records.max_records)
+        )
+        records = [normalize_record(r) for r in cursor]
+        records.reverse()
+        self._records.load(records)
+        return len(records)
+    
+    def iter_universal_records(self, batch_size: int = universal_records_batch_size) -> Iterator[List[Dict[str, Any]]]:
+        """Yields the universal dataset oldest-first, `batch_size` records at a time, from one cursor."""
+        self.flush_writes()
+        cursor = (
+            self.records_collection
+            .find({}, RECORD_PROJECTION)
+            .sort("_id", ASCENDING)
+            .batch_size(batch_size)
+        )
+        batch: List[Dict[str, Any]] = []
+        for record in cursor:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
+    def get_record(self, record_id: str) -> Optional[Dict[str, Any]]:
+        record = self._records.get(record_id)
+        if record is not None:
+            return record
+        # evicted, or written by another worker
+        self.flush_writes()
+        record = self.records_collection.find_one({"id": record_id}, RECORD_PROJECTION)
+        return normalize_record(record) if record is not None else None
+    
+    def find_records_by_client_code(self, client_code: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Oldest-first records for `client_code`, from the (client_code, _id) index."""
+        self.flush_writes()
+        cursor = (
+            self.records_collection
+            .find({"client_code": client_code}, RECORD_PROJECTION)
+            .sort("_id", ASCENDING)
+            .limit(limit)
+        )
+        return [normalize_record(r) for r in cursor]
+    
     def insert_single_record_into_mongodb(self, entry: Dict[str, Any]):
         doc = dict(entry)
         doc.pop("_id", None)
-        input_collection.insert_many([doc])
+        self.input_collection.insert_many([doc])
     
     def get_document_by_id(self, document_id: str) -> Dict[str, Any]:
-        return input_collection.find_one({"document_id": document_id})
+        self.flush_writes()
+        return self.input_collection.find_one({"document_id": document_id})
     
     def get_all_excel_uploads(self) -> List[Dict[str, Any]]:
-        return list(input_collection.find({"document_type": "excel_upload"}))
+        return list(self.input_collection.find({"document_type": "excel_upload"}))
     
     def get_all_text_field_entries(self) -> List[Dict[str, Any]]:
-        return list(input_collection.find({"document_type": "text_field_entry"}))
+        self.flush_writes()
+        return list(self.input_collection.find({"document_type": "text_field_entry"}))
     
-    def get_universal_dataset_from_mongo(self) -> Dict[str, Any]:
-        return input_collection.find_one({"document_id": "universal_dataset_main"})
-    
-    def store_processed_output(self, source_document_id: str, processed_records: List[Dict[str, Any]], output_file_path: str) -> str:
+    def store_processed_output(self, source_document_id: str, processed_records: List[Dict[str, Any]], output_file_path: str, timing_summary: Optional[Dict[str, Any]] = None) -> str:
+        """Writes the rows as result documents, then the header; a header only exists once all rows do."""
         output_document_id = f"output_{uuid.uuid4().hex[:12]}"
+        self._insert_output_results(output_document_id, processed_records)
         
         output_doc = {
             "output_document_id": output_document_id,
@@ -157,17 +513,145 @@ class UniversalDataStore:
             "processed_at": datetime.now().isoformat(),
             "record_count": len(processed_records),
             "output_file_path": output_file_path,
-            "processed_records": processed_records
+            "timing_summary": timing_summary,
+            "results_collection": self.output_results_collection.name
         }
         
-        output_collection.insert_one(output_doc)
+        self.output_collection.insert_one(output_doc)
         return output_document_id
     
+    def _insert_output_results(self, output_document_id: str, processed_records: List[Dict[str, Any]]):
+        for start in range(0, len(processed_records), output_results_batch_size):
+            chunk = processed_records[start:start + output_results_batch_size]
+            self.output_results_collection.insert_many(
+                [_result_document(output_document_id, row, record) for row, record in enumerate(chunk, start)],
+                ordered=False
+            )
+    
+    def migrate_legacy_outputs(self) -> int:
+        """
+        Moves `processed_records` arrays of older output documents into the
+        results collection; returns how many outputs were moved. Rows already
+        copied by an interrupted run are replaced, so it is safe to re-run.
+        """
+        moved = 0
+        for doc in self.output_collection.find({"processed_records": {"$exists": True}}, {"output_document_id": 1}):
+            output_document_id = doc["output_document_id"]
+            full = self.output_collection.find_one({"_id": doc["_id"]}, {"processed_records": 1})
+            self.output_results_collection.delete_many({"output_document_id": output_document_id})
+            self._insert_output_results(output_document_id, full.get("processed_records") or [])
+            self.output_collection.update_one(
+                {"_id": doc["_id"]},
+                {
+                    "$unset": {"processed_records": ""},
+                    "$set": {"results_collection": self.output_results_collection.name}
+                }
+            )
+            moved += 1
+        if moved:
+            logger.info("Moved the rows of %d outputs into '%s'", moved, self.output_results_collection.name)
+        return moved
+    
+    def finish_output(self, output_document_id: str, output_file_path: str, timing_summary: Optional[Dict[str, Any]] = None):
+        """Records the file artifact and the run's final timings once the file is written (or skipped)."""
+        self.output_collection.update_one(
+            {"output_document_id": output_document_id},
+            {"$set": {"output_file_path": output_file_path, "timing_summary": timing_summary}}
+        )
+    
     def get_output_by_id(self, output_document_id: str) -> Dict[str, Any]:
-        return output_collection.find_one({"output_document_id": output_document_id})
+        """The output header; rows are read with get_output_results / iter_output_results."""
+        return self.output_collection.find_one({"output_document_id": output_document_id})
+    
+    def get_output_results(self,
+        output_document_id: str,
+        limit: int = 1000,
+        after_row: Optional[int] = None,
+        pass_fail: Optional[str] = None,
+        score_below: Optional[float] = None) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """One page of evaluated rows ordered by row number; returns (records, next_after_row)."""
+        cursor = (
+            self.output_results_collection
+            .find(_results_query(output_document_id, after_row, pass_fail, score_below), RESULT_PROJECTION)
+            .sort("row", ASCENDING)
+            .limit(limit + 1)
+        )
+        docs = list(cursor)
+        next_after_row = docs[limit - 1]["row"] if len(docs) > limit else None
+        return [doc["record"] for doc in docs[:limit]], next_after_row
+    
+    def count_output_results(self,
+        output_document_id: str,
+        pass_fail: Optional[str] = None,
+        score_below: Optional[float] = None) -> int:
+        return self.output_results_collection.count_documents(
+            _results_query(output_document_id, None, pass_fail, score_below)
+        )
+    
+    def iter_output_results(self,
+        output_document_id: str,
+        batch_size: int = output_results_batch_size,
+        pass_fail: Optional[str] = None,
+        score_below: Optional[float] = None) -> Iterator[List[Dict[str, Any]]]:
+        """Yields every matching row in order, `batch_size` records at a time, from one cursor."""
+        cursor = (
+            self.output_results_collection
+            .find(_results_query(output_document_id, None, pass_fail, score_below), RESULT_PROJECTION)
+            .sort("row", ASCENDING)
+            .batch_size(batch_size)
+        )
+        batch: List[Dict[str, Any]] = []
+        for doc in cursor:
+            batch.append(doc["record"])
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
     
     def get_all_outputs(self) -> List[Dict[str, Any]]:
-        return list(output_collection.find())
+        return list(self.output_collection.find())
+    
+    def ensure_indexes(self):
+        self.input_collection.create_index("document_id")
+        self.records_collection.create_index("id", unique=True)
+        self.records_collection.create_index([("client_code", ASCENDING), ("_id", ASCENDING)])
+        self.input_collection.create_index([("document_type", ASCENDING), ("_id", ASCENDING)])
+        self.output_collection.create_index("output_document_id")
+        self.output_results_collection.create_index([("output_document_id", ASCENDING), ("row", ASCENDING)], unique=True)
+        self.output_results_collection.create_index([("output_document_id", ASCENDING), ("pass_fail", ASCENDING), ("row", ASCENDING)])
+        self.output_results_collection.create_index([("output_document_id", ASCENDING), ("score_overall", ASCENDING)])
+    
+    def list_document_summaries(self, document_type: str, limit: int = 100, after: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """One page of summaries ordered by _id; returns (docs, next_cursor)."""
+        self.flush_writes()
+        cursor = (
+            self.input_collection
+            .find(_page_query({"document_type": document_type}, after), DOCUMENT_SUMMARY_PROJECTION)
+            .sort("_id", ASCENDING)
+            .limit(limit + 1)
+        )
+        return _split_page(list(cursor), limit)
+    
+    def count_documents(self, document_type: str) -> int:
+        self.flush_writes()
+        return self.input_collection.count_documents({"document_type": document_type})
+    
+    def get_universal_dataset_summary(self) -> Optional[Dict[str, Any]]:
+        self.flush_writes()
+        return self.input_collection.find_one({"document_id": UNIVERSAL_DATASET_ID}, DOCUMENT_SUMMARY_PROJECTION)
+    
+    def list_output_summaries(self, limit: int = 100, after: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        cursor = (
+            self.output_collection
+            .find(_page_query({}, after), OUTPUT_SUMMARY_PROJECTION)
+            .sort("_id", ASCENDING)
+            .limit(limit + 1)
+        )
+        return _split_page(list(cursor), limit)
+    
+    def count_outputs(self) -> int:
+        return self.output_collection.count_documents({})
 
 universal_data_store = UniversalDataStore()
 
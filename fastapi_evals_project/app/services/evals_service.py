@@ -1,51 +1,114 @@
 import os
 import asyncio
+import contextvars
 import json
-import re
 import logging
-from copy import deepcopy
+import time
 from concurrent.futures import ThreadPoolExecutor
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 
 import pandas as pd
 import httpx
 
 from app.core.config import settings
-from app.services.feedback_service import FeedbackService
+from app.core.metrics import stage
+from app.services.checkpoint_store import CheckpointStore
+from app.services.feedback_service import FeedbackService, JUDGE_BATCH_SYSTEM_PROMPT, JUDGE_SYSTEM_PROMPT
+from app.services.excel_reader import read_workbook
+from app.services.output_writers import get_writer, read_output, with_extension
+from app.services.parsers import parse_lead_data, parse_transcript
+from app.services.payload_builder import PayloadBuilder, default_payload_builder
+from app.services.result_cache import ResultCache
 from app.services.transcript_client import TranscriptAnalyzerClient
-from constants import BASE_TEMPLATE
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
 
-def parse_transcript(raw: Optional[str]) -> List[Dict[str, str]]:
-    if not isinstance(raw, str):
-        return []
-    messages = []
-    for line in raw.split("\n"):
-        m = re.match(r"(assistant|user):\s*(.*)", line.strip(), re.IGNORECASE)
-        if not m:
-            continue
-        role = m.group(1).lower()
-        messages.append({"role": role, "content": m.group(2)})
-    return messages
+RESULT_COLUMNS = [
+    "predicted_output",
+    "eval_reasoning",
+    "score_accuracy",
+    "score_completeness",
+    "score_relevance",
+    "score_overall",
+    "differences",
+    "pass_fail",
+    "judge_raw",
+    "eval_error",
+]
+SCORE_COLUMNS = ["score_accuracy", "score_completeness", "score_relevance", "score_overall"]
+PASS_FAIL_CATEGORIES = ["pass", "fail"]
 
 
-def parse_lead_data(raw: Optional[str]) -> Dict[str, str]:
-    result: Dict[str, str] = {}
-    if raw is None:
-        return result
+def _format_differences(diffs: Any) -> Any:
     try:
-        if pd.isna(raw):
-            return result
+        if diffs and not isinstance(diffs, str):
+            return json.dumps(diffs)
+        return diffs
     except Exception:
-        pass
-    for line in str(raw).split("\n"):
-        if ":" in line:
-            k, v = line.split(":", 1)
-            result[k.strip()] = v.strip()
-    return result
+        return str(diffs)
+
+
+def assemble_results(df: pd.DataFrame, results: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Collects evaluate_row results into plain per-column lists and attaches
+    them to `df` in one concat, instead of a df.at write per cell. Score
+    columns come out as float64 and pass_fail as a pass/fail categorical.
+    """
+    n = len(results)
+    cols: Dict[str, List[Any]] = {name: [None] * n for name in RESULT_COLUMNS}
+    for i, res in enumerate(results):
+        if res.get("error"):
+            cols["eval_error"][i] = res["error"]
+            continue
+        cols["predicted_output"][i] = res.get("predicted_output", "")
+        judge = res.get("judge")
+        cols["judge_raw"][i] = judge
+
+        if isinstance(judge, dict):
+            cols["eval_reasoning"][i] = judge.get("reasoning") or judge.get("reason")
+            cols["score_accuracy"][i] = judge.get("accuracy")
+            cols["score_completeness"][i] = judge.get("completeness")
+            cols["score_relevance"][i] = judge.get("relevance")
+            cols["score_overall"][i] = judge.get("overall")
+            cols["differences"][i] = _format_differences(judge.get("differences"))
+            pass_fail = judge.get("pass_fail")
+            cols["pass_fail"][i] = (
+                pass_fail.strip().lower() if isinstance(pass_fail, str) else None
+            )
+        else:
+            cols["eval_error"][i] = json.dumps(judge) if judge is not None else None
+
+    result_df = pd.DataFrame(cols, index=df.index)
+    for name in SCORE_COLUMNS:
+        result_df[name] = pd.to_numeric(result_df[name], errors="coerce").astype("float64")
+    result_df["pass_fail"] = pd.Categorical(
+        result_df["pass_fail"], categories=PASS_FAIL_CATEGORIES
+    )
+    base = df.drop(columns=RESULT_COLUMNS, errors="ignore")
+    return pd.concat([base, result_df], axis=1)
+
+
+def _is_complete(res: Dict[str, Any]) -> bool:
+    judge = res.get("judge")
+    return not res.get("error") and isinstance(judge, dict) and "error" not in judge
+
+
+# False for runs that asked to skip cached results; fresh results are still cached
+_cache_reads: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "evals_cache_reads", default=True
+)
+
+
+# finished rows are checkpointed in batches, flushed on whichever limit is hit first
+CHECKPOINT_FLUSH_ROWS = 50
+CHECKPOINT_FLUSH_SECONDS = 1.0
+
+
+def dataframe_to_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    # Replace NaN values to make JSON serializable
+    return df.astype(object).where(df.notna(), "").to_dict(orient="records")
 
 
 class EvalsService:
@@ -64,9 +127,18 @@ class EvalsService:
         transcript_client: Optional[TranscriptAnalyzerClient] = None,
         feedback_client: Optional[FeedbackService] = None,
         max_workers: Optional[int] = None,
-        concurrency: Optional[int] = 1,
+        concurrency: Optional[int] = None,
+        analyzer_concurrency: Optional[int] = None,
+        executor: Optional[ThreadPoolExecutor] = None,
+        cache: Optional[ResultCache] = None,
+        judge_batch_size: Optional[int] = None,
+        payload_builder: Optional[PayloadBuilder] = None,
+        checkpoints: Optional[CheckpointStore] = None,
     ):
-        self._executor = ThreadPoolExecutor(max_workers or settings.max_workers)
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers or settings.max_workers
+        )
         self.transcript_client = transcript_client or TranscriptAnalyzerClient()
         self.feedback_client = feedback_client or FeedbackService()
         self.PROJECT_ROOT = os.path.dirname(
@@ -74,74 +146,165 @@ class EvalsService:
         )
         self.OUTPUT_DIR = os.path.join(self.PROJECT_ROOT, "outputs")
         os.makedirs(self.OUTPUT_DIR, exist_ok=True)
-        self._concurrency = concurrency or 1
+        # `concurrency` bounds in-flight judge calls; the analyzer gets its own limit
+        self._concurrency = concurrency or settings.judge_concurrency
+        self._analyzer_concurrency = (
+            analyzer_concurrency or settings.analyzer_concurrency
+        )
         self._sem = asyncio.Semaphore(self._concurrency)
+        self._analyzer_sem = asyncio.Semaphore(self._analyzer_concurrency)
+        self.cache = cache
+        self.checkpoints = checkpoints
+        self._payload_builder = payload_builder or default_payload_builder
+        # >1 switches process_excel to FeedbackService.score_batch
+        self._judge_batch_size = judge_batch_size or settings.judge_batch_size
 
-    async def _read_excel(self, path: str) -> pd.DataFrame:
+    async def read_excel(self, path: str) -> pd.DataFrame:
         loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(self._executor, lambda: pd.read_excel(path))
+        with stage("excel_read"):
+            return await loop.run_in_executor(self._executor, lambda: pd.read_excel(path))
 
-    async def _save_excel(self, df: pd.DataFrame, filename: str) -> str:
+    async def read_workbook(
+        self, path: str
+    ) -> Tuple[List[str], List[Dict[str, Any]], List[Dict[str, Any]]]:
         loop = asyncio.get_running_loop()
-        output_path = os.path.join(self.OUTPUT_DIR, filename)
-        await loop.run_in_executor(
-            self._executor, lambda: df.to_excel(output_path, index=False)
-        )
-        return output_path
+        with stage("excel_read"):
+            return await loop.run_in_executor(self._executor, read_workbook, path)
+
+    async def write_output(
+        self,
+        df: pd.DataFrame,
+        filename: str,
+        output_format: Optional[str] = None,
+        directory: Optional[str] = None,
+    ) -> str:
+        """Writes `df` under outputs/ (or `directory`), giving `filename` the format's extension."""
+        writer = get_writer(output_format or settings.output_format)
+        output_path = os.path.join(directory or self.OUTPUT_DIR, with_extension(filename, writer))
+        loop = asyncio.get_running_loop()
+        with stage("output_write"):
+            return await loop.run_in_executor(self._executor, writer.write, df, output_path)
+
+    async def read_output(self, path: str) -> pd.DataFrame:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, read_output, path)
 
     def _build_payload_from_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
-        payload = deepcopy(BASE_TEMPLATE)
-        ld = parse_lead_data(row.get("lead_data", ""))
-        print(ld)
-        client_code = row.get("client_code", "")
-        for k, v in ld.items():
-            if k in payload["lead_data"]:
-                print(k)
-                payload["lead_data"][k] = v
-                if k == 'university_name':
-                    payload["lead_data"]["university"]["id"] = None
-                    payload["lead_data"]["university"]["name"] = v
-                    continue
-                if k == 'destination_country_name':
-                    print("reached here")
-                    payload["lead_data"]["destination_country"]["id"] = None
-                    payload["lead_data"]["destination_country"]["name"] = v
-                    continue
-                if k == 'destination_city_name':
-                    payload["lead_data"]["destination_city"]["id"] = None
-                    continue
-                if k == 'budget_duration':
-                    payload["lead_data"]["budget"]["duration"] = v
-                    continue
-                if k == 'budget_currency':
-                    payload['lead_data']['budget']['currency'] = v
-                    continue
-                if k == 'min_budget':
-                    payload['lead_data']['budget']['min_budget'] = v
-                    continue
-                if k == 'max_budget':
-                    payload['lead_data']['budget']['max_budget'] = v
-                    continue
-                if k == 'lease_unit':
-                    payload['lead_data']['lease']['unit'] = v
-                if k == 'lease_value':
-                    payload['lead_data']['lease']['value'] = v
-                    continue
-        print(payload)
-        exit()
-        payload["transcript"] = parse_transcript(row.get("transcript", "") or "")
-        payload["latest_message"] = {
-            "channel": "widget",
-            "text": row.get("latest_message", "") or "",
-        }
-        payload["client_details"]["client_code"] = client_code
-        return payload
-
-    async def evaluate_row(self, row: pd.Series) -> Dict[str, Any]:
+        return self._payload_builder.build(
+            parse_lead_data(row.get("lead_data", "")),
+            transcript=parse_transcript(row.get("transcript", "") or ""),
+            latest_message=row.get("latest_message", "") or "",
+            client_code=row.get("client_code", ""),
+        )
+
+    async def _cache_get(self, namespace: str, key: Optional[str]) -> Optional[Dict[str, Any]]:
+        if key is None or not _cache_reads.get():
+            return None
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.cache.get, namespace, key)
+
+    async def _cache_set(self, namespace: str, key: Optional[str], resp: Any):
+        if key is not None and isinstance(resp, dict) and "error" not in resp:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._executor, self.cache.set, namespace, key, resp)
+
+    def _analyzer_cache_key(self, payload: Dict[str, Any]) -> Optional[str]:
+        if self.cache is None:
+            return None
+        url = getattr(self.transcript_client, "base_url", settings.transcript_analyzer_url)
+        return ResultCache.make_key(payload, url, settings.transcript_analyzer_version)
+
+    async def _analyze(self, payload: Dict[str, Any]) -> Any:
+        key = self._analyzer_cache_key(payload)
+        cached = await self._cache_get("analyzer", key)
+        if cached is not None:
+            return cached
+        with stage("analyzer_call"):
+            resp = await self.transcript_client.analyze_transcript(payload)
+        await self._cache_set("analyzer", key, resp)
+        return resp
+
+    def _judge_cache_key(
+        self, expected: str, predicted: str, transcript: str, system_prompt: str = JUDGE_SYSTEM_PROMPT
+    ) -> Optional[str]:
+        # keyed on the prompt too, so single and batched judgements never share entries
+        if self.cache is None:
+            return None
+        model = getattr(self.feedback_client, "model", None)
+        return ResultCache.make_key(
+            expected, predicted, transcript, model, system_prompt
+        )
+
+    async def _judge(self, expected: str, predicted: str, transcript: str) -> Any:
+        key = self._judge_cache_key(expected, predicted, transcript)
+        cached = await self._cache_get("judge", key)
+        if cached is not None:
+            return cached
+        async with self._sem:
+            with stage("judge_call"):
+                resp = await self.feedback_client.score(
+                    expected=expected,
+                    predicted=predicted,
+                    transcript=transcript,
+                )
+        await self._cache_set("judge", key, resp)
+        return resp
+
+    async def _evaluate_rows_batched(
+        self,
+        rows: List[pd.Series],
+        batch_size: int,
+        on_row_done: Callable[[int, Dict[str, Any]], None],
+    ) -> List[Dict[str, Any]]:
+        """Analyzer calls fan out per row; judge calls go in batches of `batch_size`."""
+        results = await asyncio.gather(
+            *(self.evaluate_row(row, judge=False) for row in rows)
+        )
+
+        pending = []
+        for i, (row, res) in enumerate(zip(rows, results)):
+            if res.get("error"):
+                on_row_done(i, res)
+                continue
+            item = {
+                "expected": str(row.get("expected_output", "") or ""),
+                "predicted": res["predicted_output"],
+                "transcript": row.get("transcript", "") or "",
+            }
+            key = self._judge_cache_key(**item, system_prompt=JUDGE_BATCH_SYSTEM_PROMPT)
+            cached = await self._cache_get("judge", key)
+            if cached is not None:
+                res["judge"] = cached
+                on_row_done(i, res)
+            else:
+                pending.append((i, item, key))
+
+        async def _judge_chunk(chunk):
+            async with self._sem:
+                with stage("judge_batch_call"):
+                    judged = await self.feedback_client.score_batch(
+                        [item for _, item, _ in chunk]
+                    )
+            for (i, _, key), resp in zip(chunk, judged):
+                results[i]["judge"] = resp
+                await self._cache_set("judge", key, resp)
+                on_row_done(i, results[i])
+
+        await asyncio.gather(
+            *(
+                _judge_chunk(pending[start : start + batch_size])
+                for start in range(0, len(pending), batch_size)
+            )
+        )
+        return results
+
+    async def evaluate_row(self, row: pd.Series, judge: bool = True) -> Dict[str, Any]:
         out: Dict[str, Any] = {"predicted_output": None, "judge": None, "error": None}
         try:
-            payload = self._build_payload_from_row(row.to_dict())
-            ta_resp = await self.transcript_client.analyze_transcript(payload)
+            async with self._analyzer_sem:
+                with stage("payload_build"):
+                    payload = self._build_payload_from_row(row.to_dict())
+                ta_resp = await self._analyze(payload)
             predicted_text = ""
             try:
                 if isinstance(ta_resp, dict):
@@ -159,15 +322,12 @@ class EvalsService:
 
             out["predicted_output"] = predicted_text
 
-            async with self._sem:
+            if judge:
                 expected = str(row.get("expected_output", "") or "")
                 transcript_raw = row.get("transcript", "") or ""
-                judge_resp = await self.feedback_client.score(
-                    expected=expected,
-                    predicted=predicted_text,
-                    transcript=transcript_raw,
+                out["judge"] = await self._judge(
+                    expected, predicted_text, transcript_raw
                 )
-                out["judge"] = judge_resp
 
             return out
         except Exception as e:
@@ -175,60 +335,167 @@ class EvalsService:
             out["error"] = str(e)
             return out
 
-    async def process_excel(
-        self, input_path: str, output_filename: Optional[str] = None
-    ) -> str:
-        df = await self._read_excel(input_path)
-        df["predicted_output"] = None
-        df["eval_reasoning"] = None
-        df["score_accuracy"] = None
-        df["score_completeness"] = None
-        df["score_relevance"] = None
-        df["score_overall"] = None
-        df["differences"] = None
-        df["pass_fail"] = None
-        df["judge_raw"] = None
-        df["eval_error"] = None
-
-        for idx, row in df.iterrows():
-            res = await self.evaluate_row(row)
-            if res.get("error"):
-                df.at[idx, "eval_error"] = res["error"]
-                continue
-            predicted = res.get("predicted_output", "")
-            df.at[idx, "predicted_output"] = predicted
-            judge = res.get("judge")
-            df.at[idx, "judge_raw"] = judge
-
-            if isinstance(judge, dict):
-                df.at[idx, "eval_reasoning"] = judge.get("reasoning") or judge.get(
-                    "reason"
+    async def iter_evaluations(
+        self, df: pd.DataFrame, use_cache: bool = True
+    ) -> AsyncIterator[Tuple[Any, Dict[str, Any]]]:
+        """
+        Yields (row index, evaluate_row result) as each row finishes, not in
+        row order. Closing the iterator early cancels the rows still running.
+        """
+
+        async def _run(idx: Any, row: pd.Series) -> Tuple[Any, Dict[str, Any]]:
+            return idx, await self.evaluate_row(row)
+
+        # tasks copy the context when created, so the flag is reset straight after
+        token = _cache_reads.set(use_cache)
+        try:
+            tasks = [asyncio.create_task(_run(idx, row)) for idx, row in df.iterrows()]
+        finally:
+            _cache_reads.reset(token)
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def evaluate_records(
+        self,
+        records: List[Dict[str, Any]],
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        judge_batch_size: Optional[int] = None,
+        use_cache: bool = True,
+    ) -> List[Dict[str, Any]]:
+        df = await self.evaluate_dataframe(
+            pd.DataFrame(records),
+            progress_callback=progress_callback,
+            judge_batch_size=judge_batch_size,
+            use_cache=use_cache,
+        )
+        return dataframe_to_records(df)
+
+    async def evaluate_dataframe(
+        self,
+        df: pd.DataFrame,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        judge_batch_size: Optional[int] = None,
+        run_id: Optional[str] = None,
+        use_cache: bool = True,
+    ) -> pd.DataFrame:
+        """
+        Evaluates every row in memory and returns a copy with result columns.
+        With a `run_id`, finished rows are checkpointed as they complete and
+        rows already checkpointed under that run are not evaluated again.
+        `use_cache=False` calls the upstreams for every row instead of reusing
+        cached results.
+        """
+        token = _cache_reads.set(use_cache)
+        try:
+            return await self._evaluate_dataframe(df, progress_callback, judge_batch_size, run_id)
+        finally:
+            _cache_reads.reset(token)
+
+    async def _evaluate_dataframe(
+        self,
+        df: pd.DataFrame,
+        progress_callback: Optional[Callable[[int, int], None]],
+        judge_batch_size: Optional[int],
+        run_id: Optional[str],
+    ) -> pd.DataFrame:
+        loop = asyncio.get_running_loop()
+        total = len(df)
+        rows = [row for _, row in df.iterrows()]
+        results: List[Optional[Dict[str, Any]]] = [None] * total
+        checkpoint_run = run_id if self.checkpoints is not None else None
+        row_hashes: List[str] = []
+        if checkpoint_run:
+            row_hashes = [CheckpointStore.row_hash(row.to_dict()) for row in rows]
+            completed = await loop.run_in_executor(self._executor, self.checkpoints.load, checkpoint_run)
+            for i, row_hash in enumerate(row_hashes):
+                results[i] = completed.get(row_hash)
+        pending = [i for i, res in enumerate(results) if res is None]
+        done = total - len(pending)
+        if done:
+            logger.info("Run %s: %d/%d rows restored from checkpoints", run_id, done, total)
+            if progress_callback:
+                progress_callback(done, total)
+
+        unsaved: List[Tuple[str, Dict[str, Any]]] = []
+        saves: List[asyncio.Future] = []
+        last_save = time.monotonic()
+
+        def _save_checkpoints():
+            nonlocal unsaved, last_save
+            if unsaved:
+                saves.append(
+                    loop.run_in_executor(self._executor, self.checkpoints.save_many, checkpoint_run, unsaved)
                 )
-                df.at[idx, "score_accuracy"] = judge.get("accuracy")
-                df.at[idx, "score_completeness"] = judge.get("completeness")
-                df.at[idx, "score_relevance"] = judge.get("relevance")
-                df.at[idx, "score_overall"] = judge.get("overall")
-                diffs = judge.get("differences")
-                try:
-                    if diffs and not isinstance(diffs, str):
-                        df.at[idx, "differences"] = json.dumps(diffs)
-                    else:
-                        df.at[idx, "differences"] = diffs
-                except Exception:
-                    df.at[idx, "differences"] = str(diffs)
-                df.at[idx, "pass_fail"] = judge.get("pass_fail")
-            else:
-                df.at[idx, "eval_reasoning"] = None
-                df.at[idx, "eval_error"] = (
-                    json.dumps(judge) if judge is not None else None
+                unsaved = []
+            last_save = time.monotonic()
+
+        def _row_done(i: int, res: Dict[str, Any]):
+            nonlocal done
+            results[i] = res
+            if checkpoint_run and _is_complete(res):
+                unsaved.append((row_hashes[i], res))
+                if len(unsaved) >= CHECKPOINT_FLUSH_ROWS or time.monotonic() - last_save >= CHECKPOINT_FLUSH_SECONDS:
+                    _save_checkpoints()
+            done += 1
+            if progress_callback:
+                progress_callback(done, total)
+
+        async def _evaluate_one(i: int):
+            _row_done(i, await self.evaluate_row(rows[i]))
+
+        batch_size = judge_batch_size or self._judge_batch_size
+        try:
+            if batch_size > 1:
+                await self._evaluate_rows_batched(
+                    [rows[i] for i in pending],
+                    batch_size,
+                    lambda j, res: _row_done(pending[j], res),
                 )
+            else:
+                # rows fan out as tasks; the analyzer/judge semaphores bound what is
+                # in flight, and results land at their original position
+                await asyncio.gather(*(_evaluate_one(i) for i in pending))
+        finally:
+            # also on failure or cancellation, so a resume skips what finished
+            if checkpoint_run:
+                _save_checkpoints()
+                await asyncio.gather(*saves)
+
+        with stage("dataframe_assembly"):
+            return assemble_results(df, results)
+
+    def discard_checkpoints(self, run_id: str):
+        if self.checkpoints is not None:
+            self.checkpoints.discard(run_id)
+
+    async def process_excel(
+        self,
+        input_path: str,
+        output_filename: Optional[str] = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        judge_batch_size: Optional[int] = None,
+        run_id: Optional[str] = None,
+        output_format: Optional[str] = None,
+        use_cache: bool = True,
+    ) -> str:
+        df = await self.read_excel(input_path)
+        df = await self.evaluate_dataframe(
+            df,
+            progress_callback=progress_callback,
+            judge_batch_size=judge_batch_size,
+            run_id=run_id,
+            use_cache=use_cache,
+        )
 
         if not output_filename:
             base, _ = os.path.splitext(os.path.basename(input_path))
             output_filename = f"{base}_evaluated.xlsx"
 
-        output_path = await self._save_excel(df, output_filename)
-        return output_path
+        return await self.write_output(df, output_filename, output_format)
 
     async def close(self):
         try:
@@ -239,3 +506,5 @@ class EvalsService:
             await self.feedback_client.close()
         except Exception:
             pass
+        if self._owns_executor:
+            self._executor.shutdown(wait=False)
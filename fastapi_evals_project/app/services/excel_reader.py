@@ -0,0 +1,32 @@
+from typing import Any, Dict, List, Tuple
+
+import pandas as pd
+
+UNIFORM_FIELDS = ["transcript", "lead_data", "latest_message", "expected_output"]
+
+
+def read_workbook(path: str) -> Tuple[List[str], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Reads every sheet from a single open ExcelFile, so the workbook ZIP/XML
+    is parsed once rather than once per sheet. Returns
+    (sheet_names, rows tagged with `_sheet_name`, uniform records keyed by
+    sheet name as client_code), both built with bulk DataFrame conversions.
+    """
+    all_data: List[Dict[str, Any]] = []
+    uniform_records: List[Dict[str, Any]] = []
+
+    with pd.ExcelFile(path) as excel_file:
+        sheet_names = excel_file.sheet_names
+        for sheet_name in sheet_names:
+            df = excel_file.parse(sheet_name)
+            df = df.fillna("")  # Replace NaN values to make JSON serializable
+            df["_sheet_name"] = sheet_name
+            all_data.extend(df.to_dict(orient="records"))
+
+            # columns missing from the sheet become None, as with record.get()
+            uniform = df.reindex(columns=UNIFORM_FIELDS).astype(object)
+            uniform = uniform.where(uniform.notna(), None)
+            uniform.insert(0, "client_code", sheet_name)
+            uniform_records.extend(uniform.to_dict(orient="records"))
+
+    return sheet_names, all_data, uniform_records
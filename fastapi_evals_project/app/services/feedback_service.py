@@ -1,53 +1,68 @@
 from asyncio.log import logger
 import json
-from typing import Any, Dict,Optional
+from typing import Any, Dict, List, Optional, Tuple
 from app.core.config import settings
+from app.services.outbound_scheduler import CircuitOpenError, OutboundScheduler
 
 import httpx
 
+JUDGE_ENDPOINT = "judge"
+
+JUDGE_SYSTEM_PROMPT = (
+    "You are an evaluator. Compare a predicted assistant response to an expected reference. "
+    "Return a single valid JSON object (no surrounding text) with keys:\n"
+    "  - accuracy: number (0.0-1.0)\n"
+    "  - completeness: number (0.0-1.0)\n"
+    "  - relevance: number (0.0-1.0)\n"
+    "  - overall: number (0.0-1.0)\n"
+    "  - reasoning: string (brief explanation)\n"
+    "  - differences: list of strings (what differs)\n"
+    "  - pass_fail: string ('pass' or 'fail')\n"
+    "Be concise and output only JSON.\n"
+)
+
+JUDGE_BATCH_SYSTEM_PROMPT = (
+    "You are an evaluator. You will receive several numbered items, each with a predicted assistant "
+    "response and an expected reference. Score every item independently.\n"
+    "Return a single valid JSON array (no surrounding text) with one object per item, each with keys:\n"
+    "  - index: integer (the item number)\n"
+    "  - accuracy: number (0.0-1.0)\n"
+    "  - completeness: number (0.0-1.0)\n"
+    "  - relevance: number (0.0-1.0)\n"
+    "  - overall: number (0.0-1.0)\n"
+    "  - reasoning: string (brief explanation)\n"
+    "  - differences: list of strings (what differs)\n"
+    "  - pass_fail: string ('pass' or 'fail')\n"
+    "Be concise and output only JSON.\n"
+)
+
 class FeedbackService:
     def __init__(self,
         base_url: Optional[str] = None,
         api_key: Optional[str] = None,
         model: Optional[str] = None,
-        timeout: Optional[int] = None):
+        timeout: Optional[int] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        scheduler: Optional[OutboundScheduler] = None):
         self.base_url = base_url or settings.openai_base_url
         self.api_key = api_key or settings.openai_api_key
         self.model = model or settings.openai_model
         self.timeout = timeout or settings.request_timeout
-        self._client = httpx.AsyncClient(timeout=self.timeout)
+        self.batch_max_prompt_tokens = settings.judge_batch_max_prompt_tokens
+        self.batch_output_tokens_per_item = settings.judge_batch_output_tokens_per_item
+        self.batch_max_output_tokens = settings.judge_batch_max_output_tokens
 
         if not self.api_key:
             logger.warning("OPENAI_API_KEY not set in settings; FeedbackService will fail if used.")
             raise ValueError("OPENAI_API_KEY not set in settings")
 
-    async def score(self,
-        expected: str,
-        predicted: str,
-        transcript: Optional[str] = None,
-        extra_instructions: Optional[str] = None) -> Dict[str, Any]:
-        system_prompt = (
-            "You are an evaluator. Compare a predicted assistant response to an expected reference. "
-            "Return a single valid JSON object (no surrounding text) with keys:\n"
-            "  - accuracy: number (0.0-1.0)\n"
-            "  - completeness: number (0.0-1.0)\n"
-            "  - relevance: number (0.0-1.0)\n"
-            "  - overall: number (0.0-1.0)\n"
-            "  - reasoning: string (brief explanation)\n"
-            "  - differences: list of strings (what differs)\n"
-            "  - pass_fail: string ('pass' or 'fail')\n"
-            "Be concise and output only JSON.\n"
-        )
-
-        user_parts = []
-        if transcript:
-            user_parts.append(f"Transcript:\n{transcript}\n")
-        user_parts.append(f"Expected Response:\n{expected}\n")
-        user_parts.append(f"Predicted Response:\n{predicted}\n")
-        if extra_instructions:
-            user_parts.append(extra_instructions)
-        user_prompt = "\n".join(user_parts)
+        # a shared client is owned (and closed) by whoever created it
+        self._owns_client = client is None
+        self._client = client or httpx.AsyncClient(timeout=self.timeout)
+        self._scheduler = scheduler
 
+    async def _chat_completion(self, system_prompt: str, user_prompt: str, max_tokens: int) -> Dict[str, Any]:
+        """Returns {"content": str} on success, otherwise the usual error dict."""
         payload = {
             "model": self.model,
             "messages": [
@@ -55,29 +70,28 @@ class FeedbackService:
                 {"role": "user", "content": user_prompt}
             ],
             "temperature": 0.0,
-            "max_tokens": 512
+            "max_tokens": max_tokens
         }
         url = f"{self.base_url}/chat/completions"
 
+        send = lambda: self._client.post(url, headers={"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}, json=payload)
+
         try:
-            resp = await self._client.post(url, headers={"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"}, json=payload)
+            if self._scheduler is None:
+                resp = await send()
+            else:
+                tokens = self._estimate_tokens(system_prompt) + self._estimate_tokens(user_prompt) + max_tokens
+                resp = await self._scheduler.send(JUDGE_ENDPOINT, send, tokens=tokens)
             resp.raise_for_status()
             data = resp.json()
             choices = data.get("choices", [])
             if not choices:
                 return {"error": "no_choices", "raw": data}
             content = choices[0].get("message", {}).get("content") or choices[0].get("text") or ""
-            try:
-                parsed = json.loads(content)
-                for k in ["accuracy", "completeness", "relevance", "overall"]:
-                    if k in parsed:
-                        try:
-                            parsed[k] = float(parsed[k])
-                        except Exception:
-                            pass
-                return parsed
-            except Exception:
-                return {"error": "invalid_json", "raw_text": content}
+            return {"content": content}
+        except CircuitOpenError as e:
+            logger.warning("OpenAI judge call skipped: %s", e)
+            return {"error": "circuit_open"}
         except httpx.TimeoutException:
             logger.exception("OpenAI judge timed out")
             return {"error": "timeout"}
@@ -92,7 +106,147 @@ class FeedbackService:
             logger.exception("Unexpected error calling OpenAI judge: %s", e)
             return {"error": "unexpected", "detail": str(e)}
 
+    @staticmethod
+    def _normalize_scores(parsed: Dict[str, Any]) -> Dict[str, Any]:
+        for k in ["accuracy", "completeness", "relevance", "overall"]:
+            if k in parsed:
+                try:
+                    parsed[k] = float(parsed[k])
+                except Exception:
+                    pass
+        return parsed
+
+    async def score(self,
+        expected: str,
+        predicted: str,
+        transcript: Optional[str] = None,
+        extra_instructions: Optional[str] = None) -> Dict[str, Any]:
+        system_prompt = JUDGE_SYSTEM_PROMPT
+
+        user_parts = []
+        if transcript:
+            user_parts.append(f"Transcript:\n{transcript}\n")
+        user_parts.append(f"Expected Response:\n{expected}\n")
+        user_parts.append(f"Predicted Response:\n{predicted}\n")
+        if extra_instructions:
+            user_parts.append(extra_instructions)
+        user_prompt = "\n".join(user_parts)
+
+        resp = await self._chat_completion(system_prompt, user_prompt, max_tokens=512)
+        if "error" in resp:
+            return resp
+        content = resp["content"]
+        try:
+            return self._normalize_scores(json.loads(content))
+        except Exception:
+            return {"error": "invalid_json", "raw_text": content}
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        # ~4 characters per token is close enough for budgeting
+        return len(text) // 4 + 1
+
+    def _format_batch_item(self, index: int, item: Dict[str, Any]) -> str:
+        parts = [f"### Item {index}"]
+        if item.get("transcript"):
+            parts.append(f"Transcript:\n{item['transcript']}")
+        parts.append(f"Expected Response:\n{item.get('expected', '')}")
+        parts.append(f"Predicted Response:\n{item.get('predicted', '')}")
+        return "\n".join(parts) + "\n"
+
+    def _split_by_budget(self, items: List[Dict[str, Any]]) -> List[List[int]]:
+        budget = self.batch_max_prompt_tokens - self._estimate_tokens(JUDGE_BATCH_SYSTEM_PROMPT)
+        # the response must also fit: cap items by the output-token budget
+        max_items = max(1, self.batch_max_output_tokens // self.batch_output_tokens_per_item)
+        batches: List[List[int]] = []
+        current: List[int] = []
+        used = 0
+        for i, item in enumerate(items):
+            cost = self._estimate_tokens(self._format_batch_item(i, item))
+            if current and (used + cost > budget or len(current) >= max_items):
+                batches.append(current)
+                current, used = [], 0
+            current.append(i)
+            used += cost
+        if current:
+            batches.append(current)
+        return batches
+
+    @staticmethod
+    def _is_valid_judgement(parsed: Any) -> bool:
+        return isinstance(parsed, dict) and "overall" in parsed and "pass_fail" in parsed
+
+    async def _score_one_request(self, items: List[Dict[str, Any]]) -> Tuple[Optional[Dict[int, Dict[str, Any]]], Optional[Dict[str, Any]]]:
+        """
+        Scores `items` in one chat completion and returns (judged, error):
+          - judged is None when the response came back but can't be parsed (or was cut off)
+          - error is the call's error dict for timeouts, HTTP errors and an open circuit
+        """
+        user_prompt = "\n".join(self._format_batch_item(i, item) for i, item in enumerate(items))
+        max_tokens = min(self.batch_output_tokens_per_item * len(items), self.batch_max_output_tokens)
+        resp = await self._chat_completion(JUDGE_BATCH_SYSTEM_PROMPT, user_prompt, max_tokens=max_tokens)
+        if "error" in resp:
+            if resp["error"] == "no_choices":
+                return None, None
+            return None, resp
+        try:
+            parsed = json.loads(resp["content"])
+        except Exception:
+            return None, None
+        if isinstance(parsed, dict):
+            parsed = parsed.get("results")
+        if not isinstance(parsed, list):
+            return None, None
+
+        judged: Dict[int, Dict[str, Any]] = {}
+        for entry in parsed:
+            if not self._is_valid_judgement(entry):
+                continue
+            try:
+                index = int(entry.pop("index"))
+            except Exception:
+                continue
+            if 0 <= index < len(items):
+                judged[index] = self._normalize_scores(entry)
+        return judged, None
+
+    async def _score_adaptive(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if len(items) == 1:
+            item = items[0]
+            return [await self.score(item.get("expected", ""), item.get("predicted", ""), item.get("transcript"))]
+
+        judged, error = await self._score_one_request(items)
+        if error is not None:
+            # the upstream itself failed; smaller requests wouldn't fare better
+            return [dict(error) for _ in items]
+        if judged is None:
+            # the response was unparseable or truncated: halve and retry
+            mid = len(items) // 2
+            return await self._score_adaptive(items[:mid]) + await self._score_adaptive(items[mid:])
+
+        results: List[Dict[str, Any]] = []
+        for i, item in enumerate(items):
+            if i in judged:
+                results.append(judged[i])
+            else:
+                # malformed or missing item: fall back to a single-row call
+                results.append(await self.score(item.get("expected", ""), item.get("predicted", ""), item.get("transcript")))
+        return results
+
+    async def score_batch(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Scores many (expected, predicted[, transcript]) items with one request
+        per token-budgeted batch. Returns one judgement per item, in order,
+        each shaped like score()'s result.
+        """
+        results: List[Dict[str, Any]] = []
+        for batch in self._split_by_budget(items):
+            results.extend(await self._score_adaptive([items[i] for i in batch]))
+        return results
+
     async def close(self):
+        if not self._owns_client:
+            return
         try:
             await self._client.aclose()
         except Exception:
@@ -0,0 +1,31 @@
+from asyncio.log import logger
+from typing import Optional
+
+import httpx
+
+from app.core.config import settings
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def build_http_client(timeout: Optional[int] = None) -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry,
+    )
+    http2 = settings.http2_enabled
+    if http2 and not _http2_available():
+        logger.warning("HTTP2_ENABLED is set but the 'h2' package is missing; using HTTP/1.1")
+        http2 = False
+    return httpx.AsyncClient(
+        timeout=timeout or settings.request_timeout,
+        limits=limits,
+        http2=http2,
+    )
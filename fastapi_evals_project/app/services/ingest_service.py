@@ -0,0 +1,118 @@
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.upload_service import UploadRejectedError
+
+INGEST_FIELDS = ("client_code", "transcript", "lead_data", "latest_message", "expected_output")
+NDJSON_CONTENT_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines"}
+MAX_REPORTED_ERRORS = 20
+
+
+class BulkIngestParser:
+    """
+    Turns a request body into batches of uniform records:
+      - NDJSON bodies are parsed line by line as they stream in
+      - JSON bodies must be a single array of objects
+    Objects without any of INGEST_FIELDS, or lines that aren't JSON objects,
+    are counted as rejected; the first few reasons are kept in `errors`.
+    """
+
+    def __init__(self, batch_size: Optional[int] = None, max_bytes: Optional[int] = None):
+        self.batch_size = max(1, batch_size or settings.ingest_batch_size)
+        self.max_bytes = max_bytes or settings.max_upload_bytes
+        self.accepted = 0
+        self.rejected = 0
+        self.errors: List[str] = []
+        self._received = 0
+
+    def _reject(self, where: str, reason: str):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"{where}: {reason}")
+
+    def _to_record(self, item: Any, where: str) -> Optional[Dict[str, Any]]:
+        if not isinstance(item, dict):
+            self._reject(where, "expected a JSON object")
+            return None
+        record = {
+            name: (item[name] if item[name] is None or isinstance(item[name], str) else str(item[name]))
+            for name in INGEST_FIELDS
+            if name in item
+        }
+        if not record:
+            self._reject(where, f"none of {list(INGEST_FIELDS)} present")
+            return None
+        self.accepted += 1
+        return record
+
+    def _count(self, chunk: bytes):
+        self._received += len(chunk)
+        if self._received > self.max_bytes:
+            raise UploadRejectedError(
+                f"Request body exceeds the {self.max_bytes} byte limit", status_code=413
+            )
+
+    async def batches(self, chunks: AsyncIterator[bytes], content_type: str) -> AsyncIterator[List[Dict[str, Any]]]:
+        media_type = (content_type or "").split(";")[0].strip().lower()
+        if media_type in NDJSON_CONTENT_TYPES:
+            source = self._ndjson_records(chunks)
+        elif media_type == "application/json":
+            source = self._json_array_records(chunks)
+        else:
+            raise UploadRejectedError(
+                f"Unsupported content type '{media_type}'; send application/json or application/x-ndjson",
+                status_code=415,
+            )
+
+        batch: List[Dict[str, Any]] = []
+        async for record in source:
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    async def _ndjson_records(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[Dict[str, Any]]:
+        pending = b""
+        line_no = 0
+        async for chunk in chunks:
+            self._count(chunk)
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+            for line in lines:
+                line_no += 1
+                record = self._parse_line(line, line_no)
+                if record is not None:
+                    yield record
+        if pending.strip():
+            record = self._parse_line(pending, line_no + 1)
+            if record is not None:
+                yield record
+
+    def _parse_line(self, line: bytes, line_no: int) -> Optional[Dict[str, Any]]:
+        if not line.strip():
+            return None
+        try:
+            item = json.loads(line)
+        except ValueError as e:
+            self._reject(f"line {line_no}", f"invalid JSON ({e})")
+            return None
+        return self._to_record(item, f"line {line_no}")
+
+    async def _json_array_records(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[Dict[str, Any]]:
+        body = bytearray()
+        async for chunk in chunks:
+            self._count(chunk)
+            body.extend(chunk)
+        try:
+            items = json.loads(body)
+        except ValueError as e:
+            raise UploadRejectedError(f"Request body is not valid JSON: {e}", status_code=400)
+        if not isinstance(items, list):
+            raise UploadRejectedError("JSON body must be an array of records", status_code=400)
+        for index, item in enumerate(items):
+            record = self._to_record(item, f"item {index}")
+            if record is not None:
+                yield record
@@ -0,0 +1,288 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+ProgressCallback = Callable[[int, int], None]
+JobHandler = Callable[[Dict[str, Any], ProgressCallback], Awaitable[Dict[str, Any]]]
+
+
+class JobStore:
+    """
+    SQLite-backed job table, shared by every worker process that points at
+    the same file, so queued/running jobs survive a restart. A running job
+    belongs to the `owner` holding its lease; a job whose lease has expired
+    (its worker died or hung) can be claimed again.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            # several worker processes poll and write the same file
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    job_type TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    progress_done INTEGER NOT NULL DEFAULT 0,
+                    progress_total INTEGER NOT NULL DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    owner TEXT,
+                    lease_expires_at REAL
+                )
+                """
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            for column, sql_type in (("owner", "TEXT"), ("lease_expires_at", "REAL")):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {sql_type}")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+
+    def _row_to_job(self, row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def insert(self, job: Dict[str, Any]):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, job_type, status, params, progress_done, progress_total, "
+                "result, error, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job["job_id"],
+                    job["job_type"],
+                    job["status"],
+                    json.dumps(job["params"]),
+                    job["progress_done"],
+                    job["progress_total"],
+                    None,
+                    None,
+                    job["created_at"],
+                    job["updated_at"],
+                ),
+            )
+
+    def update(self, job_id: str, if_owner: Optional[str] = None, **fields: Any) -> bool:
+        """With `if_owner`, only applies while that owner still holds the job; returns whether it did."""
+        fields["updated_at"] = datetime.now().isoformat()
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"], default=str)
+        columns = ", ".join(f"{k} = ?" for k in fields)
+        where, args = "job_id = ?", [job_id]
+        if if_owner is not None:
+            where, args = "job_id = ? AND owner = ?", [job_id, if_owner]
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                f"UPDATE jobs SET {columns} WHERE {where}",
+                (*fields.values(), *args),
+            )
+        return cursor.rowcount == 1
+
+    def claim(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        """
+        Moves a job to running under `owner` if it is queued or its lease has
+        expired; False if another worker got there first.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, owner = ?, lease_expires_at = ?, error = NULL, updated_at = ? "
+                "WHERE job_id = ? AND (status = ? OR (status = ? AND COALESCE(lease_expires_at, 0) < ?))",
+                (JOB_RUNNING, owner, now + lease_seconds, datetime.now().isoformat(),
+                 job_id, JOB_QUEUED, JOB_RUNNING, now),
+            )
+        return cursor.rowcount == 1
+
+    def claim_next(self, owner: str, lease_seconds: float, candidates: int = 10) -> Optional[Dict[str, Any]]:
+        """Claims the oldest claimable job, or returns None if there is none."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT job_id FROM jobs WHERE status = ? OR (status = ? AND COALESCE(lease_expires_at, 0) < ?) "
+                "ORDER BY created_at LIMIT ?",
+                (JOB_QUEUED, JOB_RUNNING, time.time(), candidates),
+            ).fetchall()
+        for (job_id,) in rows:
+            if self.claim(job_id, owner, lease_seconds):
+                return self.get(job_id)
+        return None
+
+    def renew_lease(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_expires_at = ? WHERE job_id = ? AND owner = ? AND status = ?",
+                (time.time() + lease_seconds, job_id, owner, JOB_RUNNING),
+            )
+        return cursor.rowcount == 1
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def list(self, limit: int = 100) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [self._row_to_job(r) for r in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class JobManager:
+    """
+    Runs long evaluations in the background:
+      - submit() persists the job and returns its id immediately
+      - a fixed pool of worker tasks polls the shared JobStore and claims
+        queued jobs, so any worker process can run a job submitted by another
+      - a running job's lease is renewed every `lease_seconds / 3`; jobs whose
+        lease expired (the worker died) are claimed again by whoever polls next
+      - handlers report progress, which is persisted at most once per
+        `progress_flush_interval` seconds
+      - resume() re-queues a failed job; handlers pick up from their
+        checkpoints, so rows that already finished are not re-evaluated
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        handlers: Dict[str, JobHandler],
+        workers: int = 2,
+        progress_flush_interval: float = 1.0,
+        lease_seconds: float = 60.0,
+        poll_interval: float = 1.0,
+    ):
+        self.store = store
+        self.handlers = handlers
+        self.workers = max(1, workers)
+        self.progress_flush_interval = progress_flush_interval
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        for _ in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, job_type: str, params: Dict[str, Any], job_id: Optional[str] = None) -> Dict[str, Any]:
+        if job_type not in self.handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+        now = datetime.now().isoformat()
+        job = {
+            "job_id": job_id or f"job_{uuid.uuid4().hex[:12]}",
+            "job_type": job_type,
+            "status": JOB_QUEUED,
+            "params": params,
+            "progress_done": 0,
+            "progress_total": 0,
+            "created_at": now,
+            "updated_at": now,
+        }
+        self.store.insert(job)
+        self._wakeup.set()
+        return self.store.get(job["job_id"])
+
+    def resume(self, job_id: str) -> Dict[str, Any]:
+        job = self.store.get(job_id)
+        if not job:
+            raise KeyError(job_id)
+        if job["status"] != JOB_FAILED:
+            raise ValueError(f"Job '{job_id}' is {job['status']}; only failed jobs can be resumed")
+        self.store.update(job_id, status=JOB_QUEUED, error=None, owner=None, lease_expires_at=None)
+        self._wakeup.set()
+        return self.store.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.get(job_id)
+
+    def list(self, limit: int = 100) -> List[Dict[str, Any]]:
+        return self.store.list(limit=limit)
+
+    def new_job_id(self) -> str:
+        return f"job_{uuid.uuid4().hex[:12]}"
+
+    async def _worker(self):
+        while True:
+            job = self.store.claim_next(self.owner, self.lease_seconds)
+            if job is None:
+                # submit() in this process wakes the workers early; jobs from
+                # other processes are picked up on the next poll
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job)
+
+    async def _renew_lease(self, job_id: str):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not self.store.renew_lease(job_id, self.owner, self.lease_seconds):
+                logger.warning("Lost the lease on job %s; its result will not be recorded", job_id)
+                return
+
+    async def _run(self, job: Dict[str, Any]):
+        job_id = job["job_id"]
+        handler = self.handlers[job["job_type"]]
+        last_flush = 0.0
+        heartbeat = asyncio.create_task(self._renew_lease(job_id))
+
+        def on_progress(done: int, total: int):
+            nonlocal last_flush
+            now = time.monotonic()
+            if done >= total or now - last_flush >= self.progress_flush_interval:
+                last_flush = now
+                self.store.update(job_id, if_owner=self.owner, progress_done=done, progress_total=total)
+
+        try:
+            params = dict(job["params"], job_id=job_id)
+            result = await handler(params, on_progress)
+            self.store.update(job_id, if_owner=self.owner, status=JOB_COMPLETED, result=result, lease_expires_at=None)
+        except asyncio.CancelledError:
+            # shutting down: hand the job back so another worker can take it now
+            self.store.update(job_id, if_owner=self.owner, status=JOB_QUEUED, owner=None, lease_expires_at=None)
+            raise
+        except Exception as e:
+            logger.exception("Job %s failed: %s", job_id, e)
+            self.store.update(job_id, if_owner=self.owner, status=JOB_FAILED, error=str(e), lease_expires_at=None)
+        finally:
+            heartbeat.cancel()
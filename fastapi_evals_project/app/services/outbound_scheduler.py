@@ -0,0 +1,270 @@
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class TokenBucket:
+    """Async token bucket whose refill rate can be changed while in use."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0):
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+
+    def set_rate(self, rate: float):
+        self._refill()
+        self.rate = rate
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls
+    for `reset_timeout` seconds, then lets a single probe through
+    (half-open); a successful probe closes it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self._failures = 0
+        self._probe_in_flight = False
+
+    def release_probe(self):
+        """Frees a half-open probe slot without judging the upstream (the call never finished)."""
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self._failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+
+
+class EndpointLimiter:
+    """
+    Per-endpoint budget. The request rate follows AIMD: it grows additively
+    after each success up to `max_rate` and halves on every 429, so it
+    settles around what the upstream can actually absorb.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        max_rate: float,
+        min_rate: float,
+        tokens_per_minute: Optional[float],
+        failure_threshold: int,
+        reset_timeout: float,
+    ):
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.requests = TokenBucket(rate, burst)
+        self.tokens = (
+            TokenBucket(tokens_per_minute / 60.0, tokens_per_minute)
+            if tokens_per_minute
+            else None
+        )
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.throttled = 0
+        self.retries = 0
+
+    async def acquire(self, tokens: float):
+        if self.tokens is not None and tokens:
+            await self.tokens.acquire(tokens)
+        await self.requests.acquire()
+
+    def on_success(self):
+        self.breaker.record_success()
+        if self.requests.rate < self.max_rate:
+            self.requests.set_rate(min(self.max_rate, self.requests.rate + self.max_rate * 0.02))
+
+    def on_throttled(self):
+        self.throttled += 1
+        self.requests.set_rate(max(self.min_rate, self.requests.rate / 2))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "rate_per_second": round(self.requests.rate, 3),
+            "max_rate_per_second": self.max_rate,
+            "circuit_state": self.breaker.state,
+            "throttled_responses": self.throttled,
+            "retries": self.retries,
+        }
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class OutboundScheduler:
+    """
+    Shared gate for every outbound upstream call:
+      - per-endpoint token buckets (requests/s and optional LLM tokens/min)
+      - retries on timeouts, transport errors, 429 and 5xx with jittered
+        exponential backoff, honouring Retry-After when the upstream sends it
+      - a circuit breaker per endpoint that fails fast with CircuitOpenError
+    The last retryable response is returned as-is once retries run out, so
+    callers keep their raise_for_status() error handling.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        failure_threshold: int = 10,
+        reset_timeout: float = 30.0,
+    ):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._endpoints: Dict[str, EndpointLimiter] = {}
+
+    def register(
+        self,
+        name: str,
+        rate: float,
+        burst: int,
+        tokens_per_minute: Optional[float] = None,
+        min_rate: float = 0.1,
+    ):
+        self._endpoints[name] = EndpointLimiter(
+            rate=rate,
+            burst=max(1, burst),
+            max_rate=rate,
+            min_rate=min(min_rate, rate),
+            tokens_per_minute=tokens_per_minute,
+            failure_threshold=self.failure_threshold,
+            reset_timeout=self.reset_timeout,
+        )
+
+    def _backoff(self, attempt: int) -> float:
+        # "full jitter": uniform in [0, min(cap, base * 2^attempt)]
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def send(
+        self,
+        name: str,
+        request_fn: Callable[[], Awaitable[httpx.Response]],
+        tokens: float = 0,
+    ) -> httpx.Response:
+        endpoint = self._endpoints[name]
+        for attempt in range(self.max_retries + 1):
+            if not endpoint.breaker.allow():
+                raise CircuitOpenError(f"Circuit for '{name}' is open")
+            last_attempt = attempt == self.max_retries
+
+            try:
+                await endpoint.acquire(tokens)
+                resp = await request_fn()
+            except asyncio.CancelledError:
+                # the caller went away (e.g. a streaming client disconnected)
+                endpoint.breaker.release_probe()
+                raise
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                endpoint.breaker.record_failure()
+                if last_attempt:
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning("%s call failed (%s); retry %d in %.2fs", name, e, attempt + 1, delay)
+                endpoint.retries += 1
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # anything else must still hand back a half-open probe slot
+                endpoint.breaker.record_failure()
+                raise
+
+            if resp.status_code not in RETRYABLE_STATUS_CODES:
+                endpoint.on_success()
+                return resp
+
+            if resp.status_code == 429:
+                # the upstream is healthy, just saturated: slow down, don't trip the breaker
+                endpoint.on_throttled()
+                endpoint.breaker.record_success()
+            else:
+                endpoint.breaker.record_failure()
+            if last_attempt:
+                return resp
+
+            retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+            delay = self._backoff(attempt)
+            if retry_after is not None:
+                delay = max(delay, min(retry_after, self.backoff_max))
+            logger.warning("%s returned %d; retry %d in %.2fs", name, resp.status_code, attempt + 1, delay)
+            endpoint.retries += 1
+            await resp.aclose()
+            await asyncio.sleep(delay)
+        raise RuntimeError("unreachable")
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {name: endpoint.snapshot() for name, endpoint in self._endpoints.items()}
@@ -0,0 +1,175 @@
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CSV_CHUNK_ROWS = 5000
+
+
+def pyarrow_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _flatten_nested(df: pd.DataFrame) -> pd.DataFrame:
+    # dict/list cells (judge_raw, parsed payloads) become JSON strings so every
+    # format stores them the same way and Arrow doesn't have to infer a struct
+    nested = [
+        name
+        for name in df.columns
+        if df[name].dtype == object
+        and df[name].map(lambda v: isinstance(v, (dict, list))).any()
+    ]
+    if not nested:
+        return df
+    df = df.copy()
+    for name in nested:
+        df[name] = df[name].map(
+            lambda v: json.dumps(v, default=str) if isinstance(v, (dict, list)) else v
+        )
+    return df
+
+
+def _stringify_mixed(df: pd.DataFrame) -> pd.DataFrame:
+    # Excel columns such as client_code often mix numbers and text; Arrow needs
+    # one type per column, so those become str (nulls stay null)
+    mixed = [
+        name
+        for name in df.columns
+        if df[name].dtype == object and df[name].dropna().map(type).nunique() > 1
+    ]
+    if not mixed:
+        return df
+    df = df.copy()
+    for name in mixed:
+        df[name] = df[name].map(lambda v: v if v is None or (isinstance(v, float) and pd.isna(v)) else str(v))
+    return df
+
+
+def _arrow_safe(df: pd.DataFrame) -> pd.DataFrame:
+    return _stringify_mixed(_flatten_nested(df))
+
+
+class OutputWriter(ABC):
+    name = ""
+    extension = ""
+    media_type = "application/octet-stream"
+    needs_pyarrow = False
+
+    @abstractmethod
+    def write(self, df: pd.DataFrame, path: str) -> str:
+        ...
+
+    @abstractmethod
+    def read(self, path: str) -> pd.DataFrame:
+        ...
+
+
+class ParquetWriter(OutputWriter):
+    name = "parquet"
+    extension = ".parquet"
+    media_type = "application/vnd.apache.parquet"
+    needs_pyarrow = True
+
+    def write(self, df: pd.DataFrame, path: str) -> str:
+        _arrow_safe(df).to_parquet(path, index=False, engine="pyarrow", compression="zstd")
+        return path
+
+    def read(self, path: str) -> pd.DataFrame:
+        return pd.read_parquet(path, engine="pyarrow")
+
+
+class ArrowWriter(OutputWriter):
+    name = "arrow"
+    extension = ".arrow"
+    media_type = "application/vnd.apache.arrow.file"
+    needs_pyarrow = True
+
+    def write(self, df: pd.DataFrame, path: str) -> str:
+        _arrow_safe(df).to_feather(path, compression="lz4")
+        return path
+
+    def read(self, path: str) -> pd.DataFrame:
+        return pd.read_feather(path)
+
+
+class CsvWriter(OutputWriter):
+    name = "csv"
+    extension = ".csv"
+    media_type = "text/csv"
+
+    def write(self, df: pd.DataFrame, path: str) -> str:
+        _flatten_nested(df).to_csv(path, index=False)
+        return path
+
+    def read(self, path: str) -> pd.DataFrame:
+        return pd.read_csv(path)
+
+    def iter_chunks(self, df: pd.DataFrame, chunk_rows: int = CSV_CHUNK_ROWS) -> Iterator[str]:
+        """Yields the CSV text in row chunks, header first, for streamed downloads."""
+        df = _flatten_nested(df)
+        if df.empty:
+            yield df.to_csv(index=False)
+            return
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start : start + chunk_rows].to_csv(index=False, header=start == 0)
+
+
+class ExcelWriter(OutputWriter):
+    name = "xlsx"
+    extension = ".xlsx"
+    media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+    def write(self, df: pd.DataFrame, path: str) -> str:
+        _flatten_nested(df).to_excel(path, index=False, engine="openpyxl")
+        return path
+
+    def read(self, path: str) -> pd.DataFrame:
+        return pd.read_excel(path)
+
+
+WRITERS: Dict[str, OutputWriter] = {
+    w.name: w for w in (ParquetWriter(), ArrowWriter(), CsvWriter(), ExcelWriter())
+}
+FORMAT_ALIASES = {"excel": "xlsx", "feather": "arrow", "ipc": "arrow"}
+OUTPUT_FORMATS = list(WRITERS)
+
+
+def get_writer(fmt: Optional[str]) -> OutputWriter:
+    """
+    Resolves a format name to its writer. Parquet/Arrow fall back to CSV when
+    pyarrow is not installed rather than failing the run.
+    """
+    name = (fmt or "").strip().lower()
+    name = FORMAT_ALIASES.get(name, name)
+    if name not in WRITERS:
+        raise ValueError(f"Unknown output format '{fmt}'; expected one of {OUTPUT_FORMATS}")
+    writer = WRITERS[name]
+    if writer.needs_pyarrow and not pyarrow_available():
+        logger.warning("Output format '%s' needs pyarrow, which is not installed; writing CSV", name)
+        return WRITERS["csv"]
+    return writer
+
+
+def writer_for_path(path: str) -> OutputWriter:
+    ext = os.path.splitext(path)[1].lower()
+    for writer in WRITERS.values():
+        if writer.extension == ext:
+            return writer
+    raise ValueError(f"No output writer for '{path}'")
+
+
+def with_extension(filename: str, writer: OutputWriter) -> str:
+    return os.path.splitext(filename)[0] + writer.extension
+
+
+def read_output(path: str) -> pd.DataFrame:
+    return writer_for_path(path).read(path)
@@ -0,0 +1,63 @@
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+TRANSCRIPT_ROLES = ("assistant", "user", "system", "tool")
+
+_ROLE_LINE = re.compile(r"(" + "|".join(TRANSCRIPT_ROLES) + r"):\s*(.*)", re.IGNORECASE)
+# already-lowercase roles skip the str.lower() call
+_CANONICAL_ROLES = {role: role for role in TRANSCRIPT_ROLES}
+
+
+def _is_missing(raw: Any) -> bool:
+    # NaN is the only value not equal to itself; avoids a pd.isna call per row
+    return raw is None or (isinstance(raw, float) and raw != raw)
+
+
+def parse_transcript(raw: Optional[str]) -> List[Dict[str, str]]:
+    """
+    "role: text" lines -> [{"role", "content"}] in a single pass. Roles are
+    assistant, user, system and tool; non-blank lines that don't start with
+    a role continue the previous message, and anything before the first
+    role line is ignored.
+    """
+    if not isinstance(raw, str):
+        return []
+    messages: List[Dict[str, str]] = []
+    match = _ROLE_LINE.match
+    for line in raw.split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+        m = match(line)
+        if m is not None:
+            role, content = m.groups()
+            messages.append({"role": _CANONICAL_ROLES.get(role) or role.lower(), "content": content})
+        elif messages:
+            messages[-1]["content"] += "\n" + line
+    return messages
+
+
+def parse_lead_data(raw: Any) -> Dict[str, str]:
+    """"key: value" lines -> dict; lines without a colon are ignored."""
+    result: Dict[str, str] = {}
+    if _is_missing(raw):
+        return result
+    for line in str(raw).split("\n"):
+        k, sep, v = line.partition(":")
+        if sep:
+            result[k.strip()] = v.strip()
+    return result
+
+
+def parse_transcripts(values: Iterable[Any]) -> List[List[Dict[str, str]]]:
+    """Batch form of parse_transcript for a whole column (list or Series)."""
+    return [parse_transcript(v) for v in values]
+
+
+def parse_lead_data_column(values: Iterable[Any]) -> List[Dict[str, str]]:
+    """
+    Batch form of parse_lead_data for a whole column (list or Series). Not
+    faster than per-row calls: the cost is splitting each line, which pandas'
+    str methods do no quicker and then need a Python loop to regroup.
+    """
+    return [parse_lead_data(v) for v in values]
@@ -0,0 +1,66 @@
+from copy import deepcopy
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from constants import BASE_TEMPLATE, LEAD_DATA_FIELD_PATHS
+
+Path = Tuple[str, ...]
+
+
+class PayloadBuilder:
+    """
+    Builds transcript-analyzer payloads from a template compiled once.
+
+    Every flat lead_data key is resolved to its template path up front, so a
+    row only does dict lookups. Instead of deep-copying the whole template,
+    build() shallow-copies the top level and then copies just the nested
+    dicts on the path of a value it writes; untouched subtrees are shared
+    with the template, so callers must treat payloads as read-only.
+    """
+
+    def __init__(
+        self,
+        template: Optional[Dict[str, Any]] = None,
+        field_paths: Optional[Dict[str, Path]] = None,
+    ):
+        # private copy: later edits to the source template can't leak in
+        self._template = deepcopy(template if template is not None else BASE_TEMPLATE)
+        self._paths: Dict[str, Path] = {
+            key: ("lead_data", key) for key in self._template["lead_data"]
+        }
+        self._paths.update(field_paths if field_paths is not None else LEAD_DATA_FIELD_PATHS)
+
+    def _assign(self, payload: Dict[str, Any], path: Path, value: Any, copied: Set[Path]):
+        node = payload
+        for depth in range(len(path) - 1):
+            prefix = path[: depth + 1]
+            child = node.get(path[depth])
+            if prefix not in copied or not isinstance(child, dict):
+                # template leaves such as `university` are None until set; they
+                # become {id, name} objects like destination_country
+                child = dict(child) if isinstance(child, dict) else {"id": None}
+                node[path[depth]] = child
+                copied.add(prefix)
+            node = child
+        node[path[-1]] = value
+
+    def build(
+        self,
+        lead_data: Dict[str, str],
+        transcript: List[Dict[str, str]],
+        latest_message: str,
+        client_code: Any,
+    ) -> Dict[str, Any]:
+        payload = dict(self._template)
+        copied: Set[Path] = set()
+        for key, value in lead_data.items():
+            path = self._paths.get(key)
+            if path is not None:
+                self._assign(payload, path, value, copied)
+
+        payload["transcript"] = transcript
+        payload["latest_message"] = {"channel": "widget", "text": latest_message}
+        payload["client_details"] = dict(self._template["client_details"], client_code=client_code)
+        return payload
+
+
+default_payload_builder = PayloadBuilder()
@@ -0,0 +1,109 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+_CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_RANDOM_BITS = 80
+_RANDOM_MAX = (1 << _RANDOM_BITS) - 1
+
+_id_lock = threading.Lock()
+_last_ms = -1
+_last_random = 0
+
+
+def _encode(value: int, length: int) -> str:
+    chars = []
+    for _ in range(length):
+        chars.append(_CROCKFORD[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+def new_record_id() -> str:
+    """
+    26-character ULID: 48-bit millisecond timestamp + 80 random bits.
+    IDs sort by creation time across processes, and within one process
+    IDs minted in the same millisecond stay strictly increasing.
+    """
+    global _last_ms, _last_random
+    with _id_lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms <= _last_ms:
+            # same millisecond (or the clock stepped back): keep counting up
+            now_ms = _last_ms
+            if _last_random < _RANDOM_MAX:
+                _last_random += 1
+            else:
+                now_ms += 1
+                _last_random = 0
+        else:
+            _last_random = int.from_bytes(os.urandom(10), "big")
+        _last_ms = now_ms
+        return _encode(now_ms, 10) + _encode(_last_random, 16)
+
+
+RECORD_TEXT_FIELDS = ("client_code", "transcript", "lead_data", "latest_message", "expected_output")
+
+
+def cell_text(value: Any) -> Optional[str]:
+    """Spreadsheet and JSON cells as text: 42 and 42.0 both become "42", blanks stay None."""
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def normalize_record(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Drops Mongo's _id, turns legacy integer ids into strings and stores
+    text fields as text, so records written before cells were stringified
+    read back the same as new ones.
+    """
+    record = {k: v for k, v in entry.items() if k != "_id"}
+    if record.get("id") is not None:
+        record["id"] = str(record["id"])
+    for field in RECORD_TEXT_FIELDS:
+        if field in record:
+            record[field] = cell_text(record[field])
+    return record
+
+
+class RecordIndex:
+    """
+    Bounded, thread-safe cache of recently written records by id. Once more
+    than `max_records` are held the oldest are evicted. It is never the
+    source of truth: every record is also in Mongo, which other workers write
+    to as well, so anything beyond a by-id hit is answered from there.
+    """
+
+    def __init__(self, max_records: int):
+        self.max_records = max(1, max_records)
+        self._lock = threading.RLock()
+        self._records: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def add(self, entries: List[Dict[str, Any]]):
+        with self._lock:
+            for entry in entries:
+                self._records[entry["id"]] = entry
+            while len(self._records) > self.max_records:
+                self._records.popitem(last=False)
+
+    def load(self, entries: List[Dict[str, Any]]):
+        """Replaces the contents with `entries`, oldest first."""
+        with self._lock:
+            self.clear()
+            self.add(entries)
+
+    def get(self, record_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._records.get(record_id)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
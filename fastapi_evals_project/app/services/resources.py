@@ -0,0 +1,82 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from app.core.config import settings
+from app.services.checkpoint_store import CheckpointStore
+from app.services.evals_service import EvalsService
+from app.services.feedback_service import FeedbackService, JUDGE_ENDPOINT
+from app.services.http_pool import build_http_client
+from app.services.outbound_scheduler import OutboundScheduler
+from app.services.result_cache import ResultCache
+from app.services.transcript_client import ANALYZER_ENDPOINT, TranscriptAnalyzerClient
+
+
+class SharedResources:
+    """
+    Process-lifetime resources shared by every request:
+      - one pooled httpx.AsyncClient per upstream (analyzer, judge)
+      - one OutboundScheduler (rate limits, retries, circuit breakers)
+      - one ThreadPoolExecutor for blocking pandas work
+      - one persistent ResultCache for analyzer/judge results (if enabled)
+      - one CheckpointStore for resumable runs (if enabled)
+      - one EvalsService built lazily on first use
+    Created and closed by the app lifespan in main.py.
+    """
+
+    def __init__(self):
+        self.analyzer_http_client = build_http_client()
+        self.judge_http_client = build_http_client()
+        self.outbound_scheduler = OutboundScheduler(
+            max_retries=settings.outbound_max_retries,
+            backoff_base=settings.outbound_backoff_base,
+            backoff_max=settings.outbound_backoff_max,
+            failure_threshold=settings.circuit_failure_threshold,
+            reset_timeout=settings.circuit_reset_seconds,
+        )
+        self.outbound_scheduler.register(
+            ANALYZER_ENDPOINT, rate=settings.analyzer_rate_limit, burst=settings.analyzer_burst
+        )
+        self.outbound_scheduler.register(
+            JUDGE_ENDPOINT,
+            rate=settings.judge_rate_limit,
+            burst=settings.judge_burst,
+            tokens_per_minute=settings.judge_tokens_per_minute or None,
+        )
+        self.executor = ThreadPoolExecutor(settings.max_workers)
+        self.result_cache: Optional[ResultCache] = None
+        if settings.result_cache_enabled:
+            self.result_cache = ResultCache(
+                settings.result_cache_path,
+                ttl_seconds=settings.result_cache_ttl_seconds,
+                max_entries=settings.result_cache_max_entries,
+            )
+        self.checkpoints: Optional[CheckpointStore] = None
+        if settings.checkpoints_enabled:
+            self.checkpoints = CheckpointStore(settings.checkpoint_db_path)
+        self._evals_service: Optional[EvalsService] = None
+
+    def get_evals_service(self) -> EvalsService:
+        if self._evals_service is None:
+            self._evals_service = EvalsService(
+                transcript_client=TranscriptAnalyzerClient(
+                    client=self.analyzer_http_client, scheduler=self.outbound_scheduler
+                ),
+                feedback_client=FeedbackService(
+                    client=self.judge_http_client, scheduler=self.outbound_scheduler
+                ),
+                executor=self.executor,
+                cache=self.result_cache,
+                checkpoints=self.checkpoints,
+            )
+        return self._evals_service
+
+    async def close(self):
+        if self._evals_service is not None:
+            await self._evals_service.close()
+        await self.analyzer_http_client.aclose()
+        await self.judge_http_client.aclose()
+        self.executor.shutdown(wait=False)
+        if self.result_cache is not None:
+            self.result_cache.close()
+        if self.checkpoints is not None:
+            self.checkpoints.close()
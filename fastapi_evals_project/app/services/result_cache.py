@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+# accessed_at updates from hits are queued and written together, so a hit is a plain SELECT
+TOUCH_BATCH_SIZE = 256
+
+
+class ResultCache:
+    """
+    Persistent content-addressed cache for upstream results.
+      - keys are sha256 hashes of the canonical JSON of the request inputs
+      - entries older than `ttl_seconds` are treated as misses and dropped
+      - once more than `max_entries` are stored, the least recently used go
+      - hit/miss counters are kept per namespace ("analyzer", "judge")
+    Reads never write: hits queue their LRU timestamp and expired rows are
+    left for eviction, so the blocking calls are cheap enough for an executor.
+    """
+
+    def __init__(self, db_path: str, ttl_seconds: int = 604800, max_entries: int = 100000):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS results (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS results_accessed_at ON results (accessed_at)"
+            )
+        self._size = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._touched: Dict[Tuple[str, str], float] = {}
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        canonical = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _count(self, namespace: str, field: str):
+        counters = self._stats.setdefault(namespace, {"hits": 0, "misses": 0, "writes": 0})
+        counters[field] += 1
+
+    def get(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM results WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+            if row is None:
+                self._count(namespace, "misses")
+                return None
+            value, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._count(namespace, "misses")
+                return None
+            self._touched[(namespace, key)] = now
+            if len(self._touched) >= TOUCH_BATCH_SIZE:
+                with self._conn:
+                    self._flush_touched()
+            self._count(namespace, "hits")
+        return json.loads(value)
+
+    def _flush_touched(self):
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE results SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                [(at, namespace, key) for (namespace, key), at in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def set(self, namespace: str, key: str, value: Dict[str, Any]):
+        now = time.time()
+        encoded = json.dumps(value, default=str)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (namespace, key, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, encoded, now, now),
+            )
+            # replacements over-count; _evict recounts exactly
+            self._size += 1
+            self._count(namespace, "writes")
+            if self._size > self.max_entries:
+                self._evict()
+
+    def _evict(self):
+        # trim to 90% so eviction runs once per batch of inserts, not per insert
+        target = int(self.max_entries * 0.9)
+        self._flush_touched()
+        self._conn.execute("DELETE FROM results WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+        self._conn.execute(
+            "DELETE FROM results WHERE rowid IN ("
+            "SELECT rowid FROM results ORDER BY accessed_at ASC LIMIT "
+            "MAX(0, (SELECT COUNT(*) FROM results) - ?))",
+            (target,),
+        )
+        self._size = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            namespaces = {ns: dict(c) for ns, c in self._stats.items()}
+            size = self._size
+        return {
+            "enabled": True,
+            "entries": size,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "namespaces": namespaces,
+        }
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM results")
+            self._touched.clear()
+            self._size = 0
+
+    def close(self):
+        with self._lock:
+            with self._conn:
+                self._flush_touched()
+            self._conn.close()
@@ -2,17 +2,33 @@ from asyncio.log import logger
 import httpx
 from typing import Any, Dict, Optional
 from app.core.config import settings
+from app.services.outbound_scheduler import CircuitOpenError, OutboundScheduler
+
+ANALYZER_ENDPOINT = "transcript_analyzer"
+
 class TranscriptAnalyzerClient:
-    def __init__(self, base_url: Optional[str] = None, timeout: Optional[int] = None):
+    def __init__(self, base_url: Optional[str] = None, timeout: Optional[int] = None, client: Optional[httpx.AsyncClient] = None, scheduler: Optional[OutboundScheduler] = None):
         self.base_url = base_url or settings.transcript_analyzer_url
         self.timeout = timeout or settings.request_timeout
-        self._client = httpx.AsyncClient(timeout=self.timeout)
+        # a shared client is owned (and closed) by whoever created it
+        self._owns_client = client is None
+        self._client = client or httpx.AsyncClient(timeout=self.timeout)
+        self._scheduler = scheduler
+
+    async def _post(self, payload: Dict[str, Any]) -> httpx.Response:
+        send = lambda: self._client.post(self.base_url, headers={"Content-Type": "application/json"}, json=payload)
+        if self._scheduler is None:
+            return await send()
+        return await self._scheduler.send(ANALYZER_ENDPOINT, send)
 
     async def analyze_transcript(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         try:
-            resp = await self._client.post(self.base_url, headers={"Content-Type": "application/json"}, json=payload)
+            resp = await self._post(payload)
             resp.raise_for_status()
             return resp.json()
+        except CircuitOpenError as e:
+            logger.warning("Transcript analyzer call skipped: %s", e)
+            return {"error": "circuit_open"}
         except httpx.TimeoutException:
             logger.exception("Transcript analyzer timed out")
             return {"error": "timeout"}
@@ -24,6 +40,8 @@ class TranscriptAnalyzerClient:
             return {"error": "unexpected", "detail": str(e)}
 
     async def close(self):
+        if not self._owns_client:
+            return
         try:
             await self._client.aclose()
         except Exception:
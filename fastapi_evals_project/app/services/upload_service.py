@@ -0,0 +1,89 @@
+import os
+import tempfile
+from typing import Optional
+
+import aiofiles
+from fastapi import UploadFile
+
+from app.core.config import settings
+
+ZIP_SIGNATURE = b"PK\x03\x04"
+
+# extension -> leading bytes every genuine file of that type starts with; only
+# formats openpyxl reads are accepted (legacy .xls would need xlrd)
+SPREADSHEET_SIGNATURES = {
+    ".xlsx": ZIP_SIGNATURE,
+    ".xlsm": ZIP_SIGNATURE,
+}
+
+
+class UploadRejectedError(ValueError):
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _resolve_suffix(filename: Optional[str], head: bytes) -> str:
+    suffix = os.path.splitext(filename or "")[1].lower()
+    if not suffix and head.startswith(ZIP_SIGNATURE):
+        return ".xlsx"
+    if suffix not in SPREADSHEET_SIGNATURES:
+        raise UploadRejectedError(
+            f"Unsupported file type '{suffix or filename}'; expected one of {sorted(SPREADSHEET_SIGNATURES)}",
+            status_code=415,
+        )
+    if not head.startswith(SPREADSHEET_SIGNATURES[suffix]):
+        raise UploadRejectedError(f"File '{filename}' is not a valid {suffix} spreadsheet", status_code=415)
+    return suffix
+
+
+def _too_large(max_bytes: int) -> UploadRejectedError:
+    return UploadRejectedError(f"Upload exceeds the maximum size of {max_bytes} bytes", status_code=413)
+
+
+async def save_upload(
+    upload_file: UploadFile,
+    dest_path: Optional[str] = None,
+    max_bytes: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> str:
+    """
+    Streams an uploaded spreadsheet to disk in fixed-size chunks so peak
+    memory stays at one chunk regardless of file size. Non-spreadsheets are
+    rejected from the first chunk (415) and oversized uploads as soon as the
+    limit is crossed (413). By then Starlette has already received the body;
+    UploadSizeLimitMiddleware turns away uploads that declare an oversized
+    Content-Length first. Without `dest_path` a temp file is created; the
+    caller owns the returned path.
+    """
+    max_bytes = max_bytes or settings.max_upload_bytes
+    chunk_size = chunk_size or settings.upload_chunk_size
+
+    if upload_file.size is not None and upload_file.size > max_bytes:
+        raise _too_large(max_bytes)
+
+    head = await upload_file.read(chunk_size)
+    suffix = _resolve_suffix(upload_file.filename, head)
+
+    if dest_path is None:
+        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+        dest_path = tmp.name
+        tmp.close()
+    elif not os.path.splitext(dest_path)[1]:
+        dest_path = f"{dest_path}{suffix}"
+
+    written = 0
+    try:
+        async with aiofiles.open(dest_path, "wb") as out:
+            chunk = head
+            while chunk:
+                written += len(chunk)
+                if written > max_bytes:
+                    raise _too_large(max_bytes)
+                await out.write(chunk)
+                chunk = await upload_file.read(chunk_size)
+    except BaseException:
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        raise
+    return dest_path
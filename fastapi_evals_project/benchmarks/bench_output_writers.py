@@ -0,0 +1,71 @@
+"""
+Benchmark: write time and file size of each output writer over synthetic
+evaluated frames (same columns and dtypes as assemble_results produces).
+
+    python -m benchmarks.bench_output_writers [--rows 10000 100000 1000000] [--formats parquet arrow csv xlsx]
+
+Excel is skipped above --max-excel-rows; openpyxl takes minutes at 1M rows.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import pandas as pd
+
+from app.services.evals_service import PASS_FAIL_CATEGORIES, SCORE_COLUMNS
+from app.services.output_writers import OUTPUT_FORMATS, WRITERS, pyarrow_available
+
+
+def make_frame(rows: int) -> pd.DataFrame:
+    rng = random.Random(0)
+    words = "room price london week ensuite available deposit move september contract".split()
+    sentences = [" ".join(rng.choices(words, k=16)) for _ in range(500)]
+    df = pd.DataFrame({
+        "client_code": [f"client_{rng.randrange(50)}" for _ in range(rows)],
+        "transcript": [rng.choice(sentences) * 4 for _ in range(rows)],
+        "expected_output": [rng.choice(sentences) for _ in range(rows)],
+        "predicted_output": [rng.choice(sentences) for _ in range(rows)],
+        "eval_reasoning": [rng.choice(sentences) for _ in range(rows)],
+    })
+    for name in SCORE_COLUMNS:
+        df[name] = [rng.uniform(0, 10) for _ in range(rows)]
+    df["pass_fail"] = pd.Categorical(
+        [rng.choice(PASS_FAIL_CATEGORIES) for _ in range(rows)], categories=PASS_FAIL_CATEGORIES
+    )
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--formats", nargs="+", default=OUTPUT_FORMATS, choices=OUTPUT_FORMATS)
+    parser.add_argument("--max-excel-rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    formats = [f for f in args.formats if pyarrow_available() or not WRITERS[f].needs_pyarrow]
+    skipped = sorted(set(args.formats) - set(formats))
+    if skipped:
+        print(f"skipping {skipped}: pyarrow is not installed")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for rows in args.rows:
+            df = make_frame(rows)
+            print(f"rows={rows}")
+            for fmt in formats:
+                if fmt == "xlsx" and rows > args.max_excel_rows:
+                    print(f"  {fmt:8s} skipped (> --max-excel-rows)")
+                    continue
+                writer = WRITERS[fmt]
+                path = os.path.join(tmp_dir, f"out_{rows}{writer.extension}")
+                start = time.perf_counter()
+                writer.write(df, path)
+                elapsed = time.perf_counter() - start
+                size_mb = os.path.getsize(path) / 1e6
+                print(f"  {fmt:8s} {elapsed:8.2f} s   {size_mb:9.1f} MB")
+                os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
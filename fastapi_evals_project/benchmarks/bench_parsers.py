@@ -0,0 +1,118 @@
+"""
+Benchmark: app.services.parsers vs the original per-line regex/pd.isna
+parsers, over a synthetic column.
+
+    python -m benchmarks.bench_parsers [--rows N] [--turns T] [--repeat R]
+
+Each case runs R times with the garbage collector paused (as timeit does);
+the best and median wall times are reported, since a single run swings
+with CPU frequency and whatever else the machine is doing.
+"""
+import argparse
+import gc
+import random
+import re
+import statistics
+import time
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from app.services.parsers import parse_lead_data_column, parse_transcripts
+
+
+def legacy_parse_transcript(raw: Optional[str]) -> List[Dict[str, str]]:
+    if not isinstance(raw, str):
+        return []
+    messages = []
+    for line in raw.split("\n"):
+        m = re.match(r"(assistant|user):\s*(.*)", line.strip(), re.IGNORECASE)
+        if not m:
+            continue
+        role = m.group(1).lower()
+        messages.append({"role": role, "content": m.group(2)})
+    return messages
+
+
+def legacy_parse_lead_data(raw: Optional[str]) -> Dict[str, str]:
+    result: Dict[str, str] = {}
+    if raw is None:
+        return result
+    try:
+        if pd.isna(raw):
+            return result
+    except Exception:
+        pass
+    for line in str(raw).split("\n"):
+        if ":" in line:
+            k, v = line.split(":", 1)
+            result[k.strip()] = v.strip()
+    return result
+
+
+def make_column(rows: int, turns: int):
+    rng = random.Random(0)
+    words = "room price london week ensuite available deposit move september contract".split()
+    transcripts, lead_data = [], []
+    for _ in range(rows):
+        lines = []
+        for t in range(turns):
+            role = "user" if t % 2 == 0 else "assistant"
+            lines.append(f"{role}: " + " ".join(rng.choices(words, k=12)))
+        transcripts.append("\n".join(lines))
+        lead_data.append(
+            "\n".join(f"field_{i}: " + " ".join(rng.choices(words, k=3)) for i in range(15))
+            if rng.random() > 0.1
+            else float("nan")
+        )
+    return transcripts, lead_data
+
+
+def timed(repeat: int, fn, *args):
+    """(output, best seconds, median seconds) over `repeat` runs."""
+    durations = []
+    for _ in range(repeat):
+        out = None
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            out = fn(*args)
+            durations.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return out, min(durations), statistics.median(durations)
+
+
+def report(name: str, legacy: tuple, new: tuple):
+    (old_best, old_median), (new_best, new_median) = legacy, new
+    print(
+        f"{name:<11} legacy best {old_best * 1e3:8.1f} ms  median {old_median * 1e3:8.1f} ms   "
+        f"new best {new_best * 1e3:8.1f} ms  median {new_median * 1e3:8.1f} ms   "
+        f"x{old_best / new_best:.2f} (best)  x{old_median / new_median:.2f} (median)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--turns", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    transcripts, lead_data = make_column(args.rows, args.turns)
+    repeat = max(1, args.repeat)
+
+    old_t, *old_t_s = timed(repeat, lambda col: [legacy_parse_transcript(v) for v in col], transcripts)
+    new_t, *new_t_s = timed(repeat, parse_transcripts, transcripts)
+    old_l, *old_l_s = timed(repeat, lambda col: [legacy_parse_lead_data(v) for v in col], lead_data)
+    new_l, *new_l_s = timed(repeat, parse_lead_data_column, lead_data)
+    assert old_t == new_t and old_l == new_l
+
+    print(f"rows={args.rows} turns={args.turns} repeat={repeat}")
+    report("transcript", old_t_s, new_t_s)
+    report("lead_data", old_l_s, new_l_s)
+
+
+if __name__ == "__main__":
+    main()
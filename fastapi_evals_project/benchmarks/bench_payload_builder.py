@@ -0,0 +1,71 @@
+"""
+Micro-benchmark: per-row payload build cost, deepcopy(BASE_TEMPLATE) vs
+the compiled PayloadBuilder.
+
+    python -m benchmarks.bench_payload_builder [--rows N] [--repeat R]
+"""
+import argparse
+import json
+import timeit
+from copy import deepcopy
+
+from app.services.evals_service import parse_lead_data, parse_transcript
+from app.services.payload_builder import PayloadBuilder
+from constants import BASE_TEMPLATE, LEAD_DATA_FIELD_PATHS
+
+ROW = {
+    "client_code": "fusiongroup",
+    "transcript": "user: Hi, I need a room\nassistant: Sure, which city?\nuser: London, from September",
+    "latest_message": "What is the price for an ensuite?",
+    "lead_data": (
+        "name: Jane Doe\nemail: jane@example.com\nnationality: IN\n"
+        "university_name: UCL\ndestination_country_name: United Kingdom\n"
+        "destination_city_name: London\nbudget_currency: GBP\nmin_budget: 200\n"
+        "max_budget: 350\nbudget_duration: week\nlease_value: 44\nlease_unit: week\n"
+        "move_in_date: 2025-09-01\nroom_type: ensuite"
+    ),
+}
+
+
+def build_with_deepcopy(row):
+    # the pre-compiled approach: full deepcopy, then walk every parsed key
+    payload = deepcopy(BASE_TEMPLATE)
+    for k, v in parse_lead_data(row.get("lead_data", "")).items():
+        if k in payload["lead_data"]:
+            payload["lead_data"][k] = v
+        elif k in LEAD_DATA_FIELD_PATHS:
+            _, parent, leaf = LEAD_DATA_FIELD_PATHS[k]
+            if not isinstance(payload["lead_data"][parent], dict):
+                payload["lead_data"][parent] = {"id": None}
+            payload["lead_data"][parent][leaf] = v
+    payload["transcript"] = parse_transcript(row.get("transcript", "") or "")
+    payload["latest_message"] = {"channel": "widget", "text": row.get("latest_message", "") or ""}
+    payload["client_details"]["client_code"] = row.get("client_code", "")
+    return payload
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    builder = PayloadBuilder()
+
+    def build_compiled(row):
+        return builder.build(
+            parse_lead_data(row.get("lead_data", "")),
+            transcript=parse_transcript(row.get("transcript", "") or ""),
+            latest_message=row.get("latest_message", "") or "",
+            client_code=row.get("client_code", ""),
+        )
+
+    assert json.dumps(build_compiled(ROW), sort_keys=True) == json.dumps(build_with_deepcopy(ROW), sort_keys=True)
+
+    for name, fn in [("deepcopy", build_with_deepcopy), ("compiled", build_compiled)]:
+        best = min(timeit.repeat(lambda: fn(ROW), number=args.rows, repeat=args.repeat))
+        print(f"{name:>10}: {best / args.rows * 1e6:8.2f} us/row")
+
+
+if __name__ == "__main__":
+    main()
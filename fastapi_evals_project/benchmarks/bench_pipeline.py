@@ -0,0 +1,231 @@
+"""
+End-to-end benchmark against local fakes: a fake transcript analyzer and
+OpenAI-compatible judge (configurable latency, 5xx and 429 rates) and an
+in-memory Mongo. Reports rows/s, p50/p99 latency and peak RSS for
+process_excel, POST /read-excel and POST /process_document/{id}.
+
+    python -m benchmarks.bench_pipeline [--rows 500] [--repeat 3]
+        [--scenarios process_excel read_excel process_document]
+        [--analyzer-latency-ms 80] [--judge-latency-ms 400] [--jitter-ms 20]
+        [--error-rate 0.0] [--throttle-rate 0.0] [--judge-batch-size 1]
+
+Each scenario runs in its own subprocess so peak RSS is per scenario.
+Latency is per row for process_excel and per request for the endpoints.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from benchmarks.fake_upstreams import FakeServer, UpstreamBehaviour, analyzer_app, judge_app
+from benchmarks.workbooks import write_workbook
+
+SCENARIOS = ["process_excel", "read_excel", "process_document"]
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _configure_env(args: argparse.Namespace, analyzer_url: str, judge_url: str, work_dir: str):
+    os.environ.update(
+        {
+            "TRANSCRIPT_ANALYZER_URL": f"{analyzer_url}/analyze",
+            "OPENAI_BASE_URL": judge_url,
+            "OPENAI_API_KEY": "bench",
+            "OPENAI_MODEL": "bench-judge",
+            "MONGO_URI": "mongodb://in-memory",
+            "MONGO_DB_NAME": "evals_bench",
+            "MONGO_INPUT_COLLECTION": "inputs",
+            "MONGO_OUTPUT_COLLECTION": "outputs",
+            # repeats must hit the fakes, not the cache or old checkpoints
+            "RESULT_CACHE_ENABLED": "false",
+            "CHECKPOINTS_ENABLED": "false",
+            "JOBS_DB_PATH": os.path.join(work_dir, "jobs.sqlite3"),
+            "JUDGE_BATCH_SIZE": str(args.judge_batch_size),
+            "ANALYZER_RATE_LIMIT": str(args.analyzer_rate_limit),
+            "JUDGE_RATE_LIMIT": str(args.judge_rate_limit),
+        }
+    )
+
+
+def _run_process_excel(args: argparse.Namespace, workbook: str) -> Dict[str, Any]:
+    from app.services.resources import SharedResources
+
+    async def _bench():
+        resources = SharedResources()
+        service = resources.get_evals_service()
+        row_latencies: List[float] = []
+        evaluate_row = service.evaluate_row
+
+        async def timed_evaluate_row(row, judge=True):
+            start = time.perf_counter()
+            try:
+                return await evaluate_row(row, judge=judge)
+            finally:
+                row_latencies.append(time.perf_counter() - start)
+
+        service.evaluate_row = timed_evaluate_row
+        elapsed = 0.0
+        try:
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                output_path = await service.process_excel(workbook)
+                elapsed += time.perf_counter() - start
+                os.remove(output_path)
+        finally:
+            await resources.close()
+        return elapsed, row_latencies
+
+    elapsed, latencies = asyncio.run(_bench())
+    return {"elapsed": elapsed, "latencies": latencies, "latency_unit": "row"}
+
+
+def _run_endpoint(args: argparse.Namespace, workbook: str, scenario: str) -> Dict[str, Any]:
+    from fastapi.testclient import TestClient
+
+    import main
+    from app.services.data_store import universal_data_store
+    from benchmarks.fake_mongo import use_in_memory_mongo
+
+    use_in_memory_mongo(universal_data_store)
+    with open(workbook, "rb") as f:
+        content = f.read()
+    files = {"file": ("bench.xlsx", content, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")}
+
+    latencies: List[float] = []
+    with TestClient(main.app) as client:
+        if scenario == "read_excel":
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                client.post("/api/evals/read-excel", files=files).raise_for_status()
+                latencies.append(time.perf_counter() - start)
+        else:
+            client.post("/api/evals/read-excel", files=files).raise_for_status()
+            document_id = client.get("/api/evals/documents").json()["excel_uploads"][0]["document_id"]
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                resp = client.post(f"/api/evals/process_document/{document_id}")
+                latencies.append(time.perf_counter() - start)
+                resp.raise_for_status()
+                output_file = resp.json().get("output_file")
+                if output_file and os.path.exists(output_file):
+                    os.remove(output_file)
+        universal_data_store.clear_data()
+    return {"elapsed": sum(latencies), "latencies": latencies, "latency_unit": "request"}
+
+
+def run_scenario(args: argparse.Namespace) -> Dict[str, Any]:
+    analyzer = UpstreamBehaviour(
+        latency_ms=args.analyzer_latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        seed=1,
+    )
+    judge = UpstreamBehaviour(
+        latency_ms=args.judge_latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        seed=2,
+    )
+    with tempfile.TemporaryDirectory() as work_dir, FakeServer(analyzer_app(analyzer)) as analyzer_server, FakeServer(
+        judge_app(judge)
+    ) as judge_server:
+        _configure_env(args, analyzer_server.url, judge_server.url, work_dir)
+        workbook = write_workbook(os.path.join(work_dir, "bench.xlsx"), args.rows)
+        logging.disable(logging.WARNING)
+        if args.scenario == "process_excel":
+            measured = _run_process_excel(args, workbook)
+        else:
+            measured = _run_endpoint(args, workbook, args.scenario)
+        logging.disable(logging.NOTSET)
+
+    latencies = measured["latencies"]
+    return {
+        "scenario": args.scenario,
+        "rows": args.rows,
+        "repeat": args.repeat,
+        "rows_per_second": args.rows * args.repeat / measured["elapsed"] if measured["elapsed"] else 0.0,
+        "latency_unit": measured["latency_unit"],
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        "peak_rss_mb": _peak_rss_mb(),
+        "analyzer": dict(analyzer.counters),
+        "judge": dict(judge.counters),
+    }
+
+
+def _child_argv(args: argparse.Namespace, scenario: str) -> List[str]:
+    argv = [sys.executable, "-m", "benchmarks.bench_pipeline", "--scenario", scenario]
+    for name, value in vars(args).items():
+        if name in ("scenario", "scenarios") or value is None:
+            continue
+        argv += [f"--{name.replace('_', '-')}", str(value)]
+    return argv
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenarios", nargs="+", default=SCENARIOS, choices=SCENARIOS)
+    parser.add_argument("--scenario", choices=SCENARIOS, help=argparse.SUPPRESS)
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--analyzer-latency-ms", type=float, default=80.0)
+    parser.add_argument("--judge-latency-ms", type=float, default=400.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=None)
+    parser.add_argument("--judge-batch-size", type=int, default=1)
+    parser.add_argument("--analyzer-rate-limit", type=float, default=1000.0)
+    parser.add_argument("--judge-rate-limit", type=float, default=1000.0)
+    args = parser.parse_args()
+
+    if args.scenario:
+        print(json.dumps(run_scenario(args)))
+        return
+
+    print(
+        f"rows={args.rows} repeat={args.repeat} analyzer={args.analyzer_latency_ms}ms "
+        f"judge={args.judge_latency_ms}ms errors={args.error_rate} 429s={args.throttle_rate}"
+    )
+    print(f"{'scenario':18s} {'rows/s':>9s} {'p50 ms':>9s} {'p99 ms':>9s} {'per':>8s} {'peak RSS MB':>12s}  upstream 429/5xx")
+    for scenario in args.scenarios:
+        proc = subprocess.run(_child_argv(args, scenario), capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(f"{scenario:18s} failed:\n{proc.stderr.strip()}")
+            continue
+        r = json.loads(proc.stdout.strip().splitlines()[-1])
+        throttled = r["analyzer"]["throttled"] + r["judge"]["throttled"]
+        errors = r["analyzer"]["errors"] + r["judge"]["errors"]
+        print(
+            f"{scenario:18s} {r['rows_per_second']:9.1f} {r['p50_ms']:9.1f} {r['p99_ms']:9.1f} "
+            f"{r['latency_unit']:>8s} {r['peak_rss_mb']:12.1f}  {throttled}/{errors}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+In-memory Mongo for benchmarks, backed by mongomock so the pymongo calls in
+UniversalDataStore run unchanged without an Atlas cluster.
+"""
+from typing import Any, Tuple
+
+from app.services.data_store import UniversalDataStore
+
+
+def _accept_bulk_sort(mongomock: Any):
+    # pymongo >= 4.11 passes sort= to bulk update/replace builders, which
+    # mongomock 4.3 predates; drop it (the store never sorts inside a bulk write)
+    builder = mongomock.collection.BulkOperationBuilder
+    if getattr(builder, "_accepts_sort", False):
+        return
+    for name in ("add_update", "add_replace"):
+        original = getattr(builder, name)
+
+        def patched(self, *args, _original=original, sort=None, **kwargs):
+            return _original(self, *args, **kwargs)
+
+        setattr(builder, name, patched)
+    builder._accepts_sort = True
+
+
+def in_memory_collections() -> Tuple[Any, Any]:
+    try:
+        import mongomock
+    except ImportError as e:
+        raise RuntimeError(
+            "benchmarks need mongomock for the in-memory Mongo fake: "
+            "pip install -r benchmarks/requirements.txt"
+        ) from e
+    _accept_bulk_sort(mongomock)
+    db = mongomock.MongoClient()["evals_bench"]
+    return db["inputs"], db["outputs"]
+
+
+def use_in_memory_mongo(store: UniversalDataStore) -> UniversalDataStore:
+    """Points `store` at fresh in-memory collections (before its first Mongo call)."""
+    store._input_collection, store._output_collection = in_memory_collections()
+    return store
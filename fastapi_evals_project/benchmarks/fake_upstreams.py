@@ -0,0 +1,137 @@
+"""
+Local stand-ins for the transcript analyzer and the OpenAI-compatible judge,
+served by uvicorn on a background thread so benchmarks run without network
+access. Each server has its own latency, jitter, 5xx rate and 429 rate.
+"""
+import asyncio
+import json
+import random
+import re
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+_BATCH_ITEM = re.compile(r"^### Item (\d+)$", re.MULTILINE)
+
+
+@dataclass
+class UpstreamBehaviour:
+    latency_ms: float = 50.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after: Optional[float] = None
+    seed: int = 0
+    counters: Dict[str, int] = field(default_factory=lambda: {"requests": 0, "errors": 0, "throttled": 0})
+
+    def __post_init__(self):
+        self._rng = random.Random(self.seed)
+
+    async def respond(self) -> Optional[JSONResponse]:
+        """Sleeps for the simulated latency; returns an error response when one is drawn."""
+        self.counters["requests"] += 1
+        delay = self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+        await asyncio.sleep(max(0.0, delay) / 1000.0)
+        draw = self._rng.random()
+        if draw < self.throttle_rate:
+            self.counters["throttled"] += 1
+            headers = {"Retry-After": str(self.retry_after)} if self.retry_after is not None else {}
+            return JSONResponse({"error": {"message": "rate limited"}}, status_code=429, headers=headers)
+        if draw < self.throttle_rate + self.error_rate:
+            self.counters["errors"] += 1
+            return JSONResponse({"error": {"message": "upstream failure"}}, status_code=500)
+        return None
+
+
+def _judgement(rng: random.Random) -> Dict[str, Any]:
+    overall = round(rng.uniform(0.3, 1.0), 2)
+    return {
+        "accuracy": overall,
+        "completeness": overall,
+        "relevance": overall,
+        "overall": overall,
+        "reasoning": "synthetic judgement",
+        "differences": [],
+        "pass_fail": "pass" if overall >= 0.6 else "fail",
+    }
+
+
+def analyzer_app(behaviour: UpstreamBehaviour) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/")
+    @app.post("/analyze")
+    async def analyze(request: Request):
+        payload = await request.json()
+        failure = await behaviour.respond()
+        if failure is not None:
+            return failure
+        latest = payload.get("latest_message") or {}
+        text = latest.get("text", "") if isinstance(latest, dict) else str(latest)
+        return {"channel_response": [{"text": f"Thanks for your message: {text[:80]}"}]}
+
+    return app
+
+
+def judge_app(behaviour: UpstreamBehaviour) -> FastAPI:
+    app = FastAPI()
+    rng = random.Random(behaviour.seed + 1)
+
+    @app.post("/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        failure = await behaviour.respond()
+        if failure is not None:
+            return failure
+        user_prompt = body["messages"][-1]["content"]
+        indices = [int(i) for i in _BATCH_ITEM.findall(user_prompt)]
+        if indices:
+            content = json.dumps([dict(_judgement(rng), index=i) for i in indices])
+        else:
+            content = json.dumps(_judgement(rng))
+        return {"choices": [{"message": {"role": "assistant", "content": content}}]}
+
+    return app
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class FakeServer:
+    """Runs an ASGI app with uvicorn on a daemon thread; usable as a context manager."""
+
+    def __init__(self, app: FastAPI):
+        self.port = _free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self._server = uvicorn.Server(
+            uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning", lifespan="off")
+        )
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    def start(self) -> "FakeServer":
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("fake upstream did not start")
+            time.sleep(0.01)
+        return self
+
+    def stop(self):
+        self._server.should_exit = True
+        self._thread.join(timeout=10)
+
+    def __enter__(self) -> "FakeServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
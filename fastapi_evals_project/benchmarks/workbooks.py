@@ -0,0 +1,56 @@
+"""
+Synthetic evaluation workbooks with the columns process_excel expects:
+client_code, transcript, lead_data, latest_message, expected_output.
+"""
+import random
+from typing import Any, Dict, List
+
+import pandas as pd
+
+WORDS = (
+    "room price london week ensuite available deposit move september contract "
+    "studio bills included university campus viewing booking tenancy guarantor"
+).split()
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choices(WORDS, k=words))
+
+
+def make_rows(rows: int, turns: int = 8, lead_fields: int = 14, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    out = []
+    for i in range(rows):
+        transcript = "\n".join(
+            f"{'user' if t % 2 == 0 else 'assistant'}: {_sentence(rng, 14)}" for t in range(turns)
+        )
+        lead_data = "\n".join(
+            [
+                f"name: Lead {i}",
+                f"email: lead{i}@example.com",
+                "destination_city_name: London",
+                "budget_currency: GBP",
+                f"min_budget: {rng.randrange(150, 250)}",
+                f"max_budget: {rng.randrange(250, 450)}",
+            ]
+            + [f"field_{k}: {_sentence(rng, 3)}" for k in range(max(0, lead_fields - 6))]
+        )
+        out.append(
+            {
+                "client_code": f"client_{rng.randrange(20)}",
+                "transcript": transcript,
+                "lead_data": lead_data,
+                "latest_message": _sentence(rng, 10),
+                "expected_output": _sentence(rng, 24),
+            }
+        )
+    return out
+
+
+def make_frame(rows: int, **kwargs: Any) -> pd.DataFrame:
+    return pd.DataFrame(make_rows(rows, **kwargs))
+
+
+def write_workbook(path: str, rows: int, **kwargs: Any) -> str:
+    make_frame(rows, **kwargs).to_excel(path, index=False, engine="openpyxl")
+    return path
@@ -95,4 +95,19 @@ BASE_TEMPLATE = {
     },
     "model": "1",
     "nudge_delay_in_seconds": None
-}
\ No newline at end of file
+}
+
+# Flat lead_data keys (as parsed from the "key: value" lead_data column) that
+# map to a nested BASE_TEMPLATE path. Keys that already name a field of
+# BASE_TEMPLATE["lead_data"] map to that field and need no entry here.
+LEAD_DATA_FIELD_PATHS = {
+    "university_name": ("lead_data", "university", "name"),
+    "destination_country_name": ("lead_data", "destination_country", "name"),
+    "destination_city_name": ("lead_data", "destination_city", "name"),
+    "budget_duration": ("lead_data", "budget", "duration"),
+    "budget_currency": ("lead_data", "budget", "currency"),
+    "min_budget": ("lead_data", "budget", "min_budget"),
+    "max_budget": ("lead_data", "budget", "max_budget"),
+    "lease_unit": ("lead_data", "lease", "unit"),
+    "lease_value": ("lead_data", "lease", "value"),
+}
@@ -1,12 +1,68 @@
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from app.api.controllers.evals_controller import EvalsController
 from app.api.routes import evals_routes
 from app.core.config import settings
+from app.core.metrics import render_metrics
+from app.core.serialization import default_response_class
+from app.core.upload_limits import UploadSizeLimitMiddleware
+from app.services.async_data_store import async_data_store
+from app.services.job_service import JobManager, JobStore
+from app.services.resources import SharedResources
+
+logger = logging.getLogger(__name__)
+
+
+def _job_controller() -> EvalsController:
+    return EvalsController(service=app.state.resources.get_evals_service())
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.resources = SharedResources()
+    try:
+        await async_data_store.ensure_indexes()
+    except Exception as e:
+        logger.warning("Could not create Mongo indexes at startup: %s", e)
+    try:
+        await async_data_store.migrate_legacy_universal_dataset()
+        await async_data_store.migrate_legacy_outputs()
+        await async_data_store.hydrate()
+    except Exception as e:
+        logger.warning("Could not load the universal dataset at startup: %s", e)
+    async_data_store.start_write_behind()
+    app.state.job_manager = JobManager(
+        JobStore(settings.jobs_db_path),
+        handlers={
+            "run_evals_end_to_end": lambda params, progress: _job_controller().run_upload_job(params, progress),
+            "process_document": lambda params, progress: _job_controller().run_document_job(params, progress),
+        },
+        workers=settings.job_workers,
+        lease_seconds=settings.job_lease_seconds,
+        poll_interval=settings.job_poll_interval,
+    )
+    await app.state.job_manager.start()
+    try:
+        yield
+    finally:
+        await app.state.job_manager.stop()
+        app.state.job_manager.store.close()
+        await app.state.resources.close()
+        try:
+            await async_data_store.stop_write_behind()
+        except Exception as e:
+            logger.error("Could not flush buffered writes at shutdown: %s", e)
+        async_data_store.close()
 
 
-app = FastAPI(title="Evals Processor")
+app = FastAPI(title="Evals Processor", lifespan=lifespan, default_response_class=default_response_class())
+app.add_middleware(UploadSizeLimitMiddleware, max_bytes=settings.max_upload_bytes)
 app.include_router(evals_routes.router)
 
 
-@app.on_event("shutdown")
-async def shutdown_event():
-    pass
\ No newline at end of file
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,35 @@
+import asyncio
+
+import pytest
+
+from app.api.controllers import evals_controller
+from app.api.controllers.evals_controller import EvalsController
+from app.services.async_data_store import AsyncUniversalDataStore
+from app.services.data_store import UniversalDataStore
+from app.services.evals_service import EvalsService
+from app.services.feedback_service import FeedbackService
+from benchmarks.fake_mongo import in_memory_collections
+
+
+@pytest.fixture
+def store(tmp_path):
+    """A UniversalDataStore on fresh mongomock collections; write-behind stays off."""
+    input_collection, output_collection = in_memory_collections()
+    store = UniversalDataStore(
+        excel_file_path=str(tmp_path / "universal_dataset.xlsx"),
+        input_collection=input_collection,
+        output_collection=output_collection,
+    )
+    store.ensure_indexes()
+    return store
+
+
+@pytest.fixture
+def controller(store, monkeypatch):
+    """An EvalsController whose module-level async store is backed by `store`."""
+    async_store = AsyncUniversalDataStore(store, max_workers=2)
+    monkeypatch.setattr(evals_controller, "async_data_store", async_store)
+    service = EvalsService(feedback_client=FeedbackService(base_url="http://judge.test", api_key="test"), max_workers=2)
+    yield EvalsController(service)
+    asyncio.run(service.close())
+    async_store.close()
@@ -0,0 +1,59 @@
+import asyncio
+
+import pandas as pd
+
+from app.services.checkpoint_store import CheckpointStore
+from app.services.evals_service import EvalsService
+
+
+class CountingAnalyzer:
+    base_url = "http://analyzer.test"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def analyze_transcript(self, payload):
+        self.calls += 1
+        return {"text": "reply"}
+
+    async def close(self):
+        pass
+
+
+class Judge:
+    async def score(self, expected, predicted, transcript):
+        return {"overall": 1.0, "pass_fail": "pass"}
+
+    async def close(self):
+        pass
+
+
+def _rows(n):
+    return pd.DataFrame([{"client_code": "acme", "transcript": f"t{i}", "expected_output": "e"} for i in range(n)])
+
+
+def test_save_many_round_trips(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.sqlite3"))
+    store.save_many("run", [("a", {"n": 1}), ("b", {"n": 2})])
+    assert store.load("run") == {"a": {"n": 1}, "b": {"n": 2}}
+    store.discard("run")
+    assert store.load("run") == {}
+    store.close()
+
+
+def test_a_resumed_run_skips_checkpointed_rows(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.sqlite3"))
+    analyzer = CountingAnalyzer()
+    service = EvalsService(transcript_client=analyzer, feedback_client=Judge(), checkpoints=store, judge_batch_size=1)
+
+    async def scenario():
+        await service.evaluate_dataframe(_rows(120), run_id="run")
+        assert len(store.load("run")) == 120
+        df = await service.evaluate_dataframe(_rows(121), run_id="run")
+        await service.close()
+        return df
+
+    df = asyncio.run(scenario())
+    assert analyzer.calls == 121
+    assert df["pass_fail"].tolist() == ["pass"] * 121
+    store.close()
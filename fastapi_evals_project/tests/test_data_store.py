@@ -0,0 +1,233 @@
+import asyncio
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from app.services.async_data_store import AsyncUniversalDataStore
+from app.services.data_store import UNIVERSAL_DATASET_ID, UniversalDataStore
+
+
+def _rows(n, client_code="acme"):
+    return [{"client_code": client_code, "transcript": f"t{i}", "expected_output": f"e{i}"} for i in range(n)]
+
+
+def _manifest(store):
+    return store.input_collection.find_one({"document_id": UNIVERSAL_DATASET_ID})
+
+
+def test_records_are_stored_one_document_each_with_a_manifest(store):
+    store.add_uniform_records(_rows(3), source="bulk_ingest")
+
+    docs = list(store.records_collection.find({}, {"_id": 0}).sort("_id", 1))
+    assert [d["transcript"] for d in docs] == ["t0", "t1", "t2"]
+    assert len({d["id"] for d in docs}) == 3
+
+    manifest = _manifest(store)
+    assert manifest["record_count"] == 3
+    assert manifest["records_collection"] == store.records_collection.name
+    assert "records" not in manifest
+
+
+def test_record_ids_are_unique_and_time_ordered(store):
+    store.add_uniform_records(_rows(50))
+    ids = [d["id"] for d in store.records_collection.find({}, {"id": 1}).sort("_id", 1)]
+    assert ids == sorted(ids)
+    assert len(set(ids)) == 50
+
+
+def test_write_behind_buffers_until_flushed(store):
+    store.flush_interval = 3600
+    store.start_write_behind()
+    try:
+        store.add_uniform_records(_rows(2))
+        store.add_uniform_record(client_code="acme", transcript="typed", source="text_fields")
+        assert store.records_collection.count_documents({}) == 0
+
+        assert store.flush_writes() == 4
+        assert store.records_collection.count_documents({}) == 3
+        assert store.input_collection.count_documents({"document_type": "text_field_entry"}) == 1
+        assert store.flush_writes() == 0
+    finally:
+        store.stop_write_behind()
+
+
+def test_stop_write_behind_flushes_pending_writes(store):
+    store.flush_interval = 3600
+    store.start_write_behind()
+    store.add_uniform_records(_rows(2))
+    store.stop_write_behind()
+    assert store.records_collection.count_documents({}) == 2
+
+
+def test_retried_flush_does_not_duplicate_records(store):
+    store.add_uniform_records(_rows(2))
+    store._pending_records = list(store.records_collection.find({}, {"_id": 0}))
+    store.flush_writes()
+    assert store.records_collection.count_documents({}) == 2
+
+
+def test_get_record_falls_back_to_mongo(store):
+    store.add_uniform_records(_rows(1))
+    record_id = store.records_collection.find_one()["id"]
+    store._records.clear()
+
+    assert store.get_record(record_id)["transcript"] == "t0"
+    assert store.get_record("missing") is None
+
+
+def test_client_code_lookups_see_records_from_other_workers(store):
+    other = UniversalDataStore(
+        excel_file_path=store.excel_file_path,
+        input_collection=store.input_collection,
+        output_collection=store.output_collection,
+    )
+    store.add_uniform_records(_rows(1))
+    other.add_uniform_records(_rows(1))
+    other.add_uniform_records(_rows(1, client_code="other"))
+
+    assert len(store.find_records_by_client_code("acme")) == 2
+    assert len(other.find_records_by_client_code("acme", limit=1)) == 1
+
+
+def test_iter_universal_records_batches_in_order(store):
+    store.add_uniform_records(_rows(5))
+    batches = list(store.iter_universal_records(batch_size=2))
+    assert [len(b) for b in batches] == [2, 2, 1]
+    assert [r["transcript"] for b in batches for r in b] == [f"t{i}" for i in range(5)]
+    assert all("_id" not in r for b in batches for r in b)
+
+
+def test_list_document_summaries_paginates(store):
+    for _ in range(3):
+        store.add_uniform_records(_rows(2), source="excel_upload")
+
+    first, cursor = store.list_document_summaries("excel_upload", limit=2)
+    assert len(first) == 2 and cursor is not None
+    assert all("records" not in doc for doc in first)
+
+    second, cursor = store.list_document_summaries("excel_upload", limit=2, after=cursor)
+    assert len(second) == 1 and cursor is None
+    assert {d["document_id"] for d in first}.isdisjoint(d["document_id"] for d in second)
+    assert store.count_documents("excel_upload") == 3
+
+    with pytest.raises(ValueError):
+        store.list_document_summaries("excel_upload", after="not-an-object-id")
+
+
+def test_migrate_legacy_universal_dataset(store):
+    store.input_collection.insert_one({
+        "document_id": UNIVERSAL_DATASET_ID,
+        "document_type": "universal_dataset",
+        "record_count": 2,
+        "records": [
+            {"id": 1, "timestamp": "t", "source": "old", "client_code": "a"},
+            {"id": 1, "timestamp": "t", "source": "old", "client_code": "b"},
+        ],
+    })
+
+    assert store.migrate_legacy_universal_dataset() == 2
+    assert store.migrate_legacy_universal_dataset() == 0
+
+    migrated = store.get_record("legacy-00000001")
+    assert migrated["client_code"] == "b" and migrated["legacy_id"] == "1"
+    manifest = _manifest(store)
+    assert "records" not in manifest and manifest["record_count"] == 2
+
+
+def _output_rows():
+    return [
+        {"n": i, "score_overall": i / 10, "pass_fail": "pass" if i >= 5 else "fail"} for i in range(8)
+    ] + [{"n": 8, "score_overall": "", "pass_fail": ""}]
+
+
+def test_output_results_page_and_filter(store):
+    output_id = store.store_processed_output("doc", _output_rows(), "out.parquet", {"wall_seconds": 1.0})
+
+    header = store.get_output_by_id(output_id)
+    assert header["record_count"] == 9
+    assert "processed_records" not in header
+
+    page, next_row = store.get_output_results(output_id, limit=4)
+    assert [r["n"] for r in page] == [0, 1, 2, 3] and next_row == 3
+    page, next_row = store.get_output_results(output_id, limit=4, after_row=next_row)
+    assert [r["n"] for r in page] == [4, 5, 6, 7] and next_row == 7
+    page, next_row = store.get_output_results(output_id, limit=4, after_row=next_row)
+    assert [r["n"] for r in page] == [8] and next_row is None
+
+    failed, _ = store.get_output_results(output_id, pass_fail="fail")
+    assert [r["n"] for r in failed] == [0, 1, 2, 3, 4]
+    low, _ = store.get_output_results(output_id, score_below=0.3)
+    assert [r["n"] for r in low] == [0, 1, 2]
+    assert [len(b) for b in store.iter_output_results(output_id, batch_size=4)] == [4, 4, 1]
+
+
+def test_output_file_path_and_timings_are_set_after_rows_are_stored(store):
+    output_id = store.store_processed_output("doc", _output_rows(), "", {"stages": {}})
+    store.finish_output(output_id, "outputs/doc_evaluated.parquet", {"stages": {"output_write": {"count": 1}}})
+    header = store.get_output_by_id(output_id)
+    assert header["output_file_path"] == "outputs/doc_evaluated.parquet"
+    assert "output_write" in header["timing_summary"]["stages"]
+
+
+def test_migrate_legacy_outputs(store):
+    store.output_collection.insert_one({
+        "output_document_id": "output_legacy",
+        "source_document_id": "doc",
+        "processed_at": "t",
+        "record_count": 2,
+        "output_file_path": "",
+        "processed_records": [{"n": 0, "pass_fail": "pass"}, {"n": 1, "pass_fail": "fail"}],
+    })
+
+    assert store.migrate_legacy_outputs() == 1
+    assert store.migrate_legacy_outputs() == 0
+    rows, _ = store.get_output_results("output_legacy")
+    assert [r["n"] for r in rows] == [0, 1]
+    assert "processed_records" not in store.get_output_by_id("output_legacy")
+
+
+def test_async_store_round_trip(store):
+    async_store = AsyncUniversalDataStore(store, max_workers=2)
+
+    async def scenario():
+        await async_store.add_uniform_records(_rows(5), source="excel_upload")
+        records = []
+        async for batch in async_store.iter_universal_records(batch_size=2):
+            records.extend(batch)
+        summaries, cursor = await async_store.list_document_summaries("excel_upload", limit=10)
+        output_id = await async_store.store_processed_output("doc", _output_rows(), "", None)
+        failed, _ = await async_store.get_output_results(output_id, pass_fail="fail")
+        streamed = []
+        async for batch in async_store.iter_output_results(output_id, batch_size=5):
+            streamed.extend(batch)
+        return records, summaries, cursor, failed, streamed
+
+    try:
+        records, summaries, cursor, failed, streamed = asyncio.run(scenario())
+    finally:
+        async_store.close()
+
+    assert [r["transcript"] for r in records] == [f"t{i}" for i in range(5)]
+    assert len(summaries) == 1 and cursor is None
+    assert len(failed) == 5
+    assert len(streamed) == 9
+
+
+def test_export_is_built_on_request_and_only_when_stale(store, tmp_path):
+    store.add_uniform_records(_rows(3))
+    assert not os.path.exists(store.export_file_path)
+
+    path = store.get_export_file_path()
+    assert len(pd.read_parquet(path)) == 3
+    built_at = os.path.getmtime(path)
+
+    assert store.get_export_file_path() == path
+    assert os.path.getmtime(path) == built_at
+
+    time.sleep(0.01)
+    store.add_uniform_records(_rows(2))
+    assert len(pd.read_parquet(store.get_export_file_path())) == 5
+    assert len(pd.read_excel(store.get_excel_file_path())) == 5
+    assert not [name for name in os.listdir(tmp_path) if ".tmp" in name]
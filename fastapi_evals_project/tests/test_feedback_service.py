@@ -0,0 +1,125 @@
+import asyncio
+import json
+
+import httpx
+
+from app.services.feedback_service import JUDGE_BATCH_SYSTEM_PROMPT, FeedbackService
+
+
+def _judgement(overall=0.9, index=None):
+    judged = {"accuracy": 1, "completeness": 1, "relevance": 1, "overall": overall, "pass_fail": "pass", "reasoning": "ok"}
+    if index is not None:
+        judged["index"] = index
+    return judged
+
+
+def _reply(content):
+    return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+
+class FakeJudge:
+    """
+    httpx.MockTransport handler for the chat completions endpoint. `batch`
+    and `single` map a request (its item count, for batches) to a response.
+    """
+
+    def __init__(self, batch=None, single=None):
+        self.batch = batch
+        self.single = single or (lambda: _reply(json.dumps(_judgement(overall=0.5))))
+        self.batch_sizes = []
+        self.single_calls = 0
+        self.prompts = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        messages = json.loads(request.content)["messages"]
+        system, user = messages[0]["content"], messages[1]["content"]
+        if system != JUDGE_BATCH_SYSTEM_PROMPT:
+            self.single_calls += 1
+            return self.single()
+        size = user.count("### Item ")
+        self.batch_sizes.append(size)
+        self.prompts.append(system + user)
+        return self.batch(size)
+
+
+def _all_judged(size, missing=()):
+    return _reply(json.dumps([_judgement(index=i) for i in range(size) if i not in missing]))
+
+
+def _items(n, text="x"):
+    return [{"expected": f"{text} {i}", "predicted": f"{text} {i}", "transcript": "t"} for i in range(n)]
+
+
+def _score_batch(upstream, items, **budgets):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(upstream)) as client:
+            service = FeedbackService(base_url="http://judge.test", api_key="test", client=client)
+            for name, value in budgets.items():
+                setattr(service, name, value)
+            return service, await service.score_batch(items)
+
+    return asyncio.run(run())
+
+
+def test_a_missing_index_is_scored_on_its_own():
+    upstream = FakeJudge(batch=lambda size: _all_judged(size, missing={1}))
+    _, results = _score_batch(upstream, _items(3))
+
+    assert [r["overall"] for r in results] == [0.9, 0.5, 0.9]
+    assert upstream.batch_sizes == [3]
+    assert upstream.single_calls == 1
+
+
+def test_an_unparseable_reply_is_split_in_half_recursively():
+    # only pairs parse, so 8 items go 8 -> 4 -> 2
+    upstream = FakeJudge(batch=lambda size: _all_judged(size) if size <= 2 else _reply("Sure! Here are the scores:"))
+    _, results = _score_batch(upstream, _items(8))
+
+    assert [r["overall"] for r in results] == [0.9] * 8
+    assert upstream.batch_sizes == [8, 4, 2, 2, 4, 2, 2]
+    assert upstream.single_calls == 0
+
+
+def test_a_cut_off_reply_ends_in_single_item_calls():
+    upstream = FakeJudge(batch=lambda size: _reply('[{"index": 0, "overall"'))
+    _, results = _score_batch(upstream, _items(4))
+
+    assert [r["overall"] for r in results] == [0.5] * 4
+    assert upstream.batch_sizes == [4, 2, 2]
+    assert upstream.single_calls == 4
+
+
+def test_an_upstream_error_only_marks_the_item_it_hit():
+    upstream = FakeJudge(
+        batch=lambda size: _all_judged(size, missing={2}),
+        single=lambda: httpx.Response(500, text="upstream exploded"),
+    )
+    _, results = _score_batch(upstream, _items(4))
+
+    assert [r.get("overall") for r in results] == [0.9, 0.9, None, 0.9]
+    assert results[2]["error"] == "http_error" and results[2]["status_code"] == 500
+
+
+def test_a_failed_batch_request_is_not_split():
+    upstream = FakeJudge(batch=lambda size: httpx.Response(503, text="busy"))
+    _, results = _score_batch(upstream, _items(6))
+
+    assert all(r["error"] == "http_error" for r in results)
+    assert upstream.batch_sizes == [6]
+
+
+def test_batches_stay_within_the_token_budget():
+    budgets = {"batch_max_prompt_tokens": 600, "batch_output_tokens_per_item": 100, "batch_max_output_tokens": 800}
+
+    # long items (~120 tokens each): the prompt budget binds at 3 per request
+    upstream = FakeJudge(batch=_all_judged)
+    service, results = _score_batch(upstream, _items(39, text="word " * 40), **budgets)
+    assert len(results) == 39 and all(r["overall"] == 0.9 for r in results)
+    assert upstream.batch_sizes == [3] * 13
+    assert all(service._estimate_tokens(prompt) <= 600 for prompt in upstream.prompts)
+
+    # short items: the output budget binds at 800 // 100 items per request
+    upstream = FakeJudge(batch=_all_judged)
+    _, results = _score_batch(upstream, _items(20), **budgets)
+    assert len(results) == 20
+    assert upstream.batch_sizes == [8, 8, 4]
@@ -0,0 +1,98 @@
+import asyncio
+import time
+
+from app.services.job_service import JOB_COMPLETED, JOB_QUEUED, JOB_RUNNING, JobManager, JobStore
+
+
+def _manager(db_path, handler, **kwargs) -> JobManager:
+    kwargs = {"workers": 2, "lease_seconds": 5.0, "poll_interval": 0.01, **kwargs}
+    return JobManager(JobStore(str(db_path)), {"noop": handler}, **kwargs)
+
+
+async def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def test_a_queued_job_is_claimed_once(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    manager = JobManager(store, {"noop": None})
+    job_id = manager.submit("noop", {})["job_id"]
+
+    assert store.claim(job_id, "a", lease_seconds=60)
+    assert not store.claim(job_id, "b", lease_seconds=60)
+    job = store.get(job_id)
+    assert job["status"] == JOB_RUNNING and job["owner"] == "a"
+    store.close()
+
+
+def test_two_managers_on_one_database_run_every_job_once(tmp_path):
+    db_path = tmp_path / "jobs.sqlite3"
+    calls = []
+
+    async def handler(params, on_progress):
+        calls.append(params["job_id"])
+        await asyncio.sleep(0.02)
+        return {"ok": True}
+
+    async def scenario():
+        first, second = _manager(db_path, handler), _manager(db_path, handler)
+        # only the second manager's workers run; jobs submitted to the first still get done
+        await second.start()
+        job_ids = [first.submit("noop", {})["job_id"] for _ in range(6)]
+        await first.start()
+        await _wait_for(lambda: all(first.get(j)["status"] == JOB_COMPLETED for j in job_ids))
+        await first.stop()
+        await second.stop()
+        return job_ids
+
+    job_ids = asyncio.run(scenario())
+    assert sorted(calls) == sorted(job_ids)
+
+
+def test_a_starting_manager_leaves_leased_jobs_alone_and_reclaims_expired_ones(tmp_path):
+    db_path = tmp_path / "jobs.sqlite3"
+    calls = []
+
+    async def handler(params, on_progress):
+        calls.append(params["job_id"])
+        return {"ok": True}
+
+    async def scenario():
+        dead = _manager(db_path, handler)
+        live_id = dead.submit("noop", {})["job_id"]
+        expired_id = dead.submit("noop", {})["job_id"]
+        # another worker is running `live_id`; the worker running `expired_id` died
+        assert dead.store.claim(live_id, "live-worker", lease_seconds=60)
+        assert dead.store.claim(expired_id, "dead-worker", lease_seconds=-1)
+
+        restarted = _manager(db_path, handler)
+        await restarted.start()
+        await _wait_for(lambda: restarted.get(expired_id)["status"] == JOB_COMPLETED)
+        await asyncio.sleep(0.05)
+        await restarted.stop()
+        return restarted.get(live_id), expired_id
+
+    live, expired_id = asyncio.run(scenario())
+    assert calls == [expired_id]
+    assert live["status"] == JOB_RUNNING and live["owner"] == "live-worker"
+
+
+def test_stopping_hands_a_running_job_back(tmp_path):
+    db_path = tmp_path / "jobs.sqlite3"
+
+    async def handler(params, on_progress):
+        await asyncio.sleep(3600)
+
+    async def scenario():
+        manager = _manager(db_path, handler)
+        job_id = manager.submit("noop", {})["job_id"]
+        await manager.start()
+        await _wait_for(lambda: manager.get(job_id)["status"] == JOB_RUNNING)
+        await manager.stop()
+        return manager.get(job_id)
+
+    job = asyncio.run(scenario())
+    assert job["status"] == JOB_QUEUED and job["owner"] is None
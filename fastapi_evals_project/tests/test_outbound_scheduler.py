@@ -0,0 +1,180 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.services.outbound_scheduler import (
+    CircuitBreaker,
+    CircuitOpenError,
+    OutboundScheduler,
+    TokenBucket,
+    parse_retry_after,
+)
+
+URL = "http://upstream.test/analyze"
+
+
+class FakeUpstream:
+    """httpx.MockTransport handler that replays a script of responses (or exceptions)."""
+
+    def __init__(self, *script):
+        self.script = list(script)
+        self.calls = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        step = self.script.pop(0) if len(self.script) > 1 else self.script[0]
+        if isinstance(step, Exception):
+            raise step
+        status, headers = step if isinstance(step, tuple) else (step, {})
+        return httpx.Response(status, headers=headers, json={})
+
+
+def _scheduler(**kwargs) -> OutboundScheduler:
+    kwargs = {"max_retries": 2, "backoff_base": 0.0, "backoff_max": 1.0, "failure_threshold": 2, "reset_timeout": 0.1, **kwargs}
+    scheduler = OutboundScheduler(**kwargs)
+    scheduler.register("analyzer", rate=1000, burst=1000)
+    return scheduler
+
+
+def _send(scheduler: OutboundScheduler, upstream: FakeUpstream):
+    async def call():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(upstream)) as client:
+            return await scheduler.send("analyzer", lambda: client.post(URL))
+
+    return call()
+
+
+def test_token_bucket_paces_requests():
+    bucket = TokenBucket(rate=20, capacity=1)
+
+    async def drain():
+        start = time.monotonic()
+        for _ in range(5):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    # the first token is already there, the other four arrive every 50ms
+    assert asyncio.run(drain()) >= 0.18
+
+
+def test_retries_until_success():
+    upstream = FakeUpstream(503, httpx.ConnectError("refused"), 200)
+    scheduler = _scheduler(failure_threshold=10)
+    assert asyncio.run(_send(scheduler, upstream)).status_code == 200
+    assert upstream.calls == 3
+    assert scheduler.snapshot()["analyzer"]["retries"] == 2
+
+
+def test_last_retryable_response_is_returned_when_retries_run_out():
+    upstream = FakeUpstream(503)
+    resp = asyncio.run(_send(_scheduler(failure_threshold=10), upstream))
+    assert resp.status_code == 503
+    assert upstream.calls == 3
+
+
+def test_retry_after_is_honoured_and_throttling_halves_the_rate():
+    upstream = FakeUpstream((429, {"Retry-After": "0.2"}), 200)
+    scheduler = _scheduler()
+    start = time.monotonic()
+    assert asyncio.run(_send(scheduler, upstream)).status_code == 200
+    assert time.monotonic() - start >= 0.2
+    snapshot = scheduler.snapshot()["analyzer"]
+    assert snapshot["throttled_responses"] == 1
+    assert snapshot["rate_per_second"] < 1000
+    # 429 means busy, not broken
+    assert snapshot["circuit_state"] == CircuitBreaker.CLOSED
+
+
+def test_backoff_and_retry_after_are_capped():
+    scheduler = _scheduler(backoff_base=10.0, backoff_max=0.05)
+    assert all(scheduler._backoff(attempt) <= 0.05 for attempt in range(20))
+
+    upstream = FakeUpstream((503, {"Retry-After": "120"}), 200)
+    start = time.monotonic()
+    asyncio.run(_send(scheduler, upstream))
+    assert time.monotonic() - start < 1.0
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("1.5") == 1.5
+    assert parse_retry_after("-3") == 0.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_breaker_opens_half_opens_and_closes():
+    scheduler = _scheduler(max_retries=1)
+    breaker = scheduler._endpoints["analyzer"].breaker
+
+    asyncio.run(_send(scheduler, FakeUpstream(500)))
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(_send(scheduler, FakeUpstream(200)))
+
+    time.sleep(0.15)
+    assert asyncio.run(_send(scheduler, FakeUpstream(200))).status_code == 200
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_failed_probe_reopens_the_breaker():
+    scheduler = _scheduler(max_retries=0)
+    breaker = scheduler._endpoints["analyzer"].breaker
+    for _ in range(2):
+        asyncio.run(_send(scheduler, FakeUpstream(500)))
+    assert breaker.state == CircuitBreaker.OPEN
+
+    time.sleep(0.15)
+    asyncio.run(_send(scheduler, FakeUpstream(500)))
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(_send(scheduler, FakeUpstream(200)))
+
+
+def test_half_open_admits_one_probe_at_a_time():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure()
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.allow() and breaker.allow()
+
+
+def test_cancelled_probe_releases_the_half_open_slot():
+    scheduler = _scheduler(max_retries=0)
+    breaker = scheduler._endpoints["analyzer"].breaker
+    for _ in range(2):
+        asyncio.run(_send(scheduler, FakeUpstream(500)))
+    time.sleep(0.15)
+
+    async def hanging_probe():
+        task = asyncio.create_task(scheduler.send("analyzer", lambda: asyncio.sleep(3600)))
+        await asyncio.sleep(0.01)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(hanging_probe())
+    assert asyncio.run(_send(scheduler, FakeUpstream(200))).status_code == 200
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_unexpected_probe_error_releases_the_half_open_slot():
+    scheduler = _scheduler(max_retries=0)
+    breaker = scheduler._endpoints["analyzer"].breaker
+    for _ in range(2):
+        asyncio.run(_send(scheduler, FakeUpstream(500)))
+    time.sleep(0.15)
+
+    async def broken():
+        raise RuntimeError("bug in the request builder")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(scheduler.send("analyzer", broken))
+    assert breaker.state == CircuitBreaker.OPEN
+
+    time.sleep(0.15)
+    assert asyncio.run(_send(scheduler, FakeUpstream(200))).status_code == 200
@@ -0,0 +1,28 @@
+import asyncio
+import json
+
+
+def _rows():
+    return [{"n": i, "score_overall": i / 10, "pass_fail": "pass" if i >= 6 else "fail"} for i in range(9)]
+
+
+def _read(controller, output_id, **filters):
+    async def scenario():
+        stream = await controller.stream_output(output_id, "ndjson", **filters)
+        body = b"".join([chunk async for chunk in stream["chunks"]])
+        return stream["record_count"], [json.loads(line) for line in body.splitlines()]
+
+    return asyncio.run(scenario())
+
+
+def test_record_count_matches_what_is_streamed(controller, store):
+    output_id = store.store_processed_output("doc", _rows(), "", None)
+
+    count, rows = _read(controller, output_id)
+    assert count == len(rows) == 9
+
+    count, rows = _read(controller, output_id, pass_fail="pass")
+    assert count == len(rows) == 3
+
+    count, rows = _read(controller, output_id, pass_fail="fail", score_below=0.2)
+    assert count == len(rows) == 2
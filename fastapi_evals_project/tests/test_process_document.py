@@ -0,0 +1,34 @@
+import asyncio
+
+
+class Analyzer:
+    base_url = "http://analyzer.test"
+
+    async def analyze_transcript(self, payload):
+        return {"text": "reply"}
+
+    async def close(self):
+        pass
+
+
+class Judge:
+    async def score(self, expected, predicted, transcript):
+        return {"overall": 1.0, "pass_fail": "pass"}
+
+    async def close(self):
+        pass
+
+
+def test_saved_timings_include_the_output_write(controller, store, tmp_path):
+    controller.service.transcript_client = Analyzer()
+    controller.service.feedback_client = Judge()
+    controller.service.OUTPUT_DIR = str(tmp_path)
+    store.add_uniform_record(client_code="acme", transcript="hi", expected_output="hello", source="text_fields")
+    document_id = store.input_collection.find_one({"document_type": "text_field_entry"})["document_id"]
+
+    result = asyncio.run(controller.process_document_by_id(document_id, output_format="csv"))
+
+    header = store.get_output_by_id(result["output_document_id"])
+    assert header["output_file_path"] == result["output_file"]
+    assert "output_write" in header["timing_summary"]["stages"]
+    assert header["timing_summary"] == result["timing_summary"]
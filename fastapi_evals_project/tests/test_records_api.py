@@ -0,0 +1,43 @@
+import asyncio
+import io
+
+import pandas as pd
+from starlette.datastructures import UploadFile
+
+
+def _workbook(tmp_path) -> bytes:
+    path = tmp_path / "numeric.xlsx"
+    pd.DataFrame([
+        {"transcript": "hi", "lead_data": 7, "latest_message": 1.5, "expected_output": 42},
+        {"transcript": "hey", "lead_data": None, "latest_message": "ok", "expected_output": 43},
+    ]).to_excel(path, sheet_name="acme", index=False)
+    return path.read_bytes()
+
+
+def test_numeric_cells_read_back_as_text(controller, tmp_path):
+    upload = UploadFile(io.BytesIO(_workbook(tmp_path)), filename="numeric.xlsx")
+
+    async def scenario():
+        await controller.handle_excel_read(upload)
+        listed = await controller.find_records_by_client_code("acme")
+        one = await controller.get_record_by_id(listed.records[0].id)
+        return listed, one
+
+    listed, one = asyncio.run(scenario())
+    assert [r.expected_output for r in listed.records] == ["42", "43"]
+    assert listed.records[0].lead_data == "7" and listed.records[0].latest_message == "1.5"
+    assert listed.records[1].lead_data == ""
+    assert one.expected_output == "42"
+
+
+def test_numeric_client_codes_and_stored_numbers_are_served(controller, store):
+    store.add_uniform_records([{"client_code": 7, "transcript": "t", "expected_output": 1}])
+    # written before cells were stringified
+    store.records_collection.insert_one({"id": "legacy", "timestamp": "t", "source": "old", "client_code": "7", "expected_output": 2.0})
+
+    async def scenario():
+        return await controller.find_records_by_client_code("7"), await controller.get_record_by_id("legacy")
+
+    listed, legacy = asyncio.run(scenario())
+    assert [r.expected_output for r in listed.records] == ["1", "2"]
+    assert legacy.expected_output == "2"
@@ -0,0 +1,91 @@
+import asyncio
+
+import pandas as pd
+
+from app.core.config import settings
+from app.services.evals_service import EvalsService
+from app.services.result_cache import ResultCache
+
+
+class FakeAnalyzer:
+    def __init__(self, base_url="http://analyzer.test/v1"):
+        self.base_url = base_url
+        self.calls = 0
+
+    async def analyze_transcript(self, payload):
+        self.calls += 1
+        return {"text": f"reply {self.calls}"}
+
+    async def close(self):
+        pass
+
+
+class FakeJudge:
+    model = "judge-model"
+
+    async def score(self, expected, predicted, transcript):
+        return {"overall": 1.0, "pass_fail": "pass"}
+
+    async def close(self):
+        pass
+
+
+def _service(cache, analyzer):
+    return EvalsService(transcript_client=analyzer, feedback_client=FakeJudge(), cache=cache, judge_batch_size=1)
+
+
+def _rows():
+    return pd.DataFrame([{"client_code": "acme", "transcript": "hi", "expected_output": "hello"}])
+
+
+def test_hits_do_not_write_until_the_touch_batch_fills(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite3"))
+    cache.set("judge", "k", {"overall": 1})
+    before = cache._conn.total_changes
+
+    assert cache.get("judge", "k") == {"overall": 1}
+    assert cache._conn.total_changes == before
+    assert cache.stats()["namespaces"]["judge"]["hits"] == 1
+    cache.close()
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=-1)
+    cache.set("judge", "k", {"overall": 1})
+    assert cache.get("judge", "k") is None
+    cache.close()
+
+
+def test_analyzer_key_covers_url_and_version(tmp_path, monkeypatch):
+    cache = ResultCache(str(tmp_path / "cache.sqlite3"))
+    payload = {"transcript": "hi"}
+    first = _service(cache, FakeAnalyzer())._analyzer_cache_key(payload)
+
+    assert _service(cache, FakeAnalyzer("http://analyzer.test/v2"))._analyzer_cache_key(payload) != first
+    monkeypatch.setattr(settings, "transcript_analyzer_version", "2024-06")
+    assert _service(cache, FakeAnalyzer())._analyzer_cache_key(payload) != first
+    cache.close()
+
+
+def test_use_cache_false_calls_the_analyzer_again(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite3"))
+    analyzer = FakeAnalyzer()
+    service = _service(cache, analyzer)
+
+    async def scenario():
+        await service.evaluate_dataframe(_rows())
+        await service.evaluate_dataframe(_rows())
+        assert analyzer.calls == 1
+        df = await service.evaluate_dataframe(_rows(), use_cache=False)
+        assert analyzer.calls == 2
+        # the fresh result replaced the cached one
+        await service.evaluate_dataframe(_rows())
+        assert analyzer.calls == 2
+        return df
+
+    try:
+        df = asyncio.run(scenario())
+    finally:
+        asyncio.run(service.close())
+        cache.close()
+    assert df["predicted_output"].tolist() == ["reply 2"]
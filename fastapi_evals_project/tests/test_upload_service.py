@@ -0,0 +1,67 @@
+import asyncio
+import io
+import os
+
+import pytest
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from app.core.upload_limits import MULTIPART_OVERHEAD_BYTES, UploadSizeLimitMiddleware
+from app.services.upload_service import ZIP_SIGNATURE, UploadRejectedError, save_upload
+
+OLE_SIGNATURE = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+
+
+def _save(body: bytes, filename: str, dest_path: str, **kwargs) -> str:
+    return asyncio.run(save_upload(UploadFile(io.BytesIO(body), filename=filename), dest_path=dest_path, **kwargs))
+
+
+def test_xlsx_is_saved_in_chunks(tmp_path):
+    body = ZIP_SIGNATURE + b"x" * 100
+    path = _save(body, "book.xlsx", str(tmp_path / "upload"), chunk_size=16)
+    assert path.endswith(".xlsx")
+    with open(path, "rb") as f:
+        assert f.read() == body
+
+
+@pytest.mark.parametrize("body, filename", [
+    (OLE_SIGNATURE + b"x" * 10, "legacy.xls"),
+    (OLE_SIGNATURE + b"x" * 10, "legacy"),
+    (b"not a zip", "book.xlsx"),
+    (ZIP_SIGNATURE, "notes.txt"),
+])
+def test_unreadable_types_are_rejected_with_415(tmp_path, body, filename):
+    with pytest.raises(UploadRejectedError) as e:
+        _save(body, filename, str(tmp_path / "upload"))
+    assert e.value.status_code == 415
+
+
+def test_oversized_uploads_are_rejected_with_413_and_removed(tmp_path):
+    with pytest.raises(UploadRejectedError) as e:
+        _save(ZIP_SIGNATURE + b"x" * 100, "book.xlsx", str(tmp_path / "upload"), max_bytes=50, chunk_size=16)
+    assert e.value.status_code == 413
+    assert os.listdir(tmp_path) == []
+
+
+def _limited_app(calls):
+    app = FastAPI()
+    app.add_middleware(UploadSizeLimitMiddleware, max_bytes=1024)
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        calls.append(file.filename)
+        return {"ok": True}
+
+    return app
+
+
+def test_declared_oversized_uploads_are_rejected_before_the_route():
+    calls = []
+    client = TestClient(_limited_app(calls))
+
+    small = client.post("/upload", files={"file": ("book.xlsx", b"x" * 100)})
+    assert small.status_code == 200
+
+    large = client.post("/upload", files={"file": ("book.xlsx", b"x" * (1024 + MULTIPART_OVERHEAD_BYTES + 1))})
+    assert large.status_code == 413
+    assert calls == ["book.xlsx"]